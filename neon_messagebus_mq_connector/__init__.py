@@ -17,4 +17,11 @@
 # US Patents 2008-2021: US7424516, US20140161250, US20140177813, US8638908, US8068604, US8553852, US10530923, US10530924
 # China Patent: CN102017585  -  Europe Patent: EU2156652  -  Patents Pending
 
-from neon_messagebus_mq_connector.controller import ChatAPIProxy
+
+def __getattr__(name: str):
+    # `ChatAPIProxy` is imported on first access so that importing this
+    # package does not load the messagebus client and MQ dependencies
+    if name == "ChatAPIProxy":
+        from neon_messagebus_mq_connector.controller import ChatAPIProxy
+        return ChatAPIProxy
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
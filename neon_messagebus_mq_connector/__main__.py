@@ -34,7 +34,6 @@ from typing import Optional
 from ovos_utils.log import LOG
 
 from neon_messagebus_mq_connector.config import Configuration
-from neon_messagebus_mq_connector import ChatAPIProxy
 
 
 def _get_default_config() -> dict:
@@ -54,6 +53,7 @@ def main(config: Optional[dict] = None, daemon=False):
     LOG.info(f'Starting Neon Message Bus Proxy Listener (pid: {os.getpid()})...')
     config = config or _get_default_config()
     try:
+        from neon_messagebus_mq_connector.controller import ChatAPIProxy
         connector = ChatAPIProxy(config=config, service_name='chat_api_proxy')
         connector.run(run_sync=True, run_consumers=True,
                       daemonize_consumers=daemon)
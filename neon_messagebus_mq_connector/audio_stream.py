@@ -0,0 +1,245 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Framework
+# All trademark and other rights reserved by their respective owners
+# Copyright 2008-2025 Neongecko.com Inc.
+# Contributors: Daniel McKnight, Guy Daniels, Elon Gasper, Richard Leeds,
+# Regina Bloomstine, Casimiro Ferreira, Andrii Pernatii, Kirill Hrymailo
+# BSD-3 License
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from this
+#    software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS  BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS;  OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import time
+
+from base64 import b64decode, b64encode
+from threading import Lock
+from typing import Dict, List, Optional
+from ovos_utils.log import LOG
+
+
+class AudioStream:
+    """
+    Reassembly buffer for a single chunked audio stream
+    """
+
+    def __init__(self, stream_id: str, total_bytes: Optional[int] = None):
+        self.stream_id = stream_id
+        self.total_bytes = total_bytes
+        self.buffer = bytearray()
+        self.final_size = None
+        self.final_message = None
+        self.last_update = time.time()
+        # Sorted, non-overlapping `[start, end)` byte ranges received
+        self._ranges: List[List[int]] = list()
+
+    @property
+    def received_bytes(self) -> int:
+        return sum(end - start for start, end in self._ranges)
+
+    def required_bytes(self, offset: int, chunk: bytes) -> int:
+        """
+        Get the buffer size needed to add a chunk. The whole buffer is
+        allocated with the first chunk when the client declares its size.
+        :param offset: byte offset of `chunk` in the complete audio
+        :param chunk: decoded audio bytes
+        :returns: buffer size in bytes after adding `chunk`
+        """
+        return max(len(self.buffer), offset + len(chunk),
+                   self.total_bytes or 0)
+
+    @property
+    def complete(self) -> bool:
+        return self.final_size is not None and \
+            self.received_bytes == self.final_size
+
+    def _add_range(self, start: int, end: int):
+        ranges = []
+        for range_start, range_end in self._ranges:
+            if range_end < start or range_start > end:
+                ranges.append([range_start, range_end])
+            else:
+                # Merge overlapping or adjacent ranges
+                start = min(start, range_start)
+                end = max(end, range_end)
+        ranges.append([start, end])
+        self._ranges = sorted(ranges)
+
+    def add_chunk(self, offset: int, chunk: bytes, final: bool = False):
+        """
+        Write a decoded chunk into the buffer at `offset`. Chunks may overlap
+        previously received chunks (i.e. if a client re-sends audio).
+        :param offset: byte offset of `chunk` in the complete audio
+        :param chunk: decoded audio bytes
+        :param final: True if this is the last chunk of the audio
+        """
+        self.last_update = time.time()
+        end = offset + len(chunk)
+        size = self.final_size if self.final_size is not None else \
+            self.total_bytes
+        if size is not None and end > size:
+            raise ValueError(f"Chunk {offset}:{end} exceeds stream "
+                             f"size={size}")
+        if final:
+            final_size = self.total_bytes or end
+            if self._ranges and self._ranges[-1][1] > final_size:
+                raise ValueError(f"Received data beyond final chunk end "
+                                 f"{final_size}")
+            self.final_size = final_size
+        required = self.required_bytes(offset, chunk)
+        if required > len(self.buffer):
+            self.buffer.extend(bytes(required - len(self.buffer)))
+        self.buffer[offset:end] = chunk
+        if chunk:
+            self._add_range(offset, end)
+
+
+class AudioStreamReassembler:
+    """
+    Reassembles `neon.audio_input` and `neon.get_stt` requests sent as a
+    series of MQ messages, each containing a chunk of the audio. Chunked
+    requests include a `stream` object in `data`:
+
+        {"stream_id": str,      # unique ID shared by all chunks of a request
+         "offset": int,         # byte offset of this (decoded) chunk
+         "final": bool,         # True for the last chunk
+         "total_bytes": int}    # optional decoded audio length
+
+    Chunks may arrive in any order. The `msg_type`, `data`, and `context` of
+    the final chunk are used for the reassembled request.
+    """
+
+    def __init__(self, timeout: float = 30, max_bytes: int = 32 * 1024 * 1024,
+                 max_streams: int = 100,
+                 max_total_bytes: int = 256 * 1024 * 1024):
+        """
+        :param timeout: seconds after the last received chunk before an
+            incomplete stream is discarded
+        :param max_bytes: maximum decoded size of a single stream
+        :param max_streams: maximum number of incomplete streams
+        :param max_total_bytes: maximum total buffer size of all incomplete
+            streams
+        """
+        self.timeout = timeout
+        self.max_bytes = max_bytes
+        self.max_streams = max_streams
+        self.max_total_bytes = max_total_bytes
+        self._streams: Dict[str, AudioStream] = dict()
+        self._buffered_bytes = 0
+        self._lock = Lock()
+
+    @staticmethod
+    def is_chunk(message_data: dict) -> bool:
+        """
+        Check if a deserialized MQ request is part of a chunked audio stream
+        """
+        return message_data.get('msg_type') in ("neon.audio_input",
+                                                "neon.get_stt") and \
+            isinstance((message_data.get('data') or {}).get('stream'), dict)
+
+    @property
+    def active_streams(self) -> int:
+        return len(self._streams)
+
+    @property
+    def buffered_bytes(self) -> int:
+        return self._buffered_bytes
+
+    def _remove(self, stream_id: str) -> Optional[AudioStream]:
+        stream = self._streams.pop(stream_id, None)
+        if stream:
+            self._buffered_bytes -= len(stream.buffer)
+        return stream
+
+    def add_chunk(self, message_data: dict) -> Optional[dict]:
+        """
+        Add a chunk of a streamed request
+        :param message_data: deserialized MQ request containing a chunk
+        :returns: reassembled request if this chunk completed the stream,
+            else None
+        """
+        stream_spec = message_data['data'].pop('stream')
+        stream_id = stream_spec.get('stream_id')
+        if not stream_id:
+            raise ValueError("Audio chunk missing `stream_id`")
+        chunk = b64decode(message_data['data'].pop('audio_data', ''))
+        offset = int(stream_spec.get('offset', 0))
+        total_bytes = stream_spec.get('total_bytes')
+        if offset < 0 or offset + len(chunk) > self.max_bytes or \
+                (total_bytes and int(total_bytes) > self.max_bytes):
+            self.discard(stream_id)
+            raise ValueError(f"Audio stream {stream_id} exceeds "
+                             f"max_bytes={self.max_bytes}")
+        self.prune()
+        with self._lock:
+            stream = self._streams.get(stream_id)
+            if not stream:
+                if len(self._streams) >= self.max_streams:
+                    raise ValueError(f"Rejected audio stream {stream_id}: "
+                                     f"{self.max_streams} streams active")
+                stream = AudioStream(stream_id, int(total_bytes)
+                                     if total_bytes else None)
+                self._streams[stream_id] = stream
+            # Check the total buffer size before allocating anything
+            allocated = len(stream.buffer)
+            if self._buffered_bytes - allocated + \
+                    stream.required_bytes(offset, chunk) > \
+                    self.max_total_bytes:
+                self._remove(stream_id)
+                raise ValueError(f"Rejected audio stream {stream_id}: "
+                                 f"buffered audio exceeds max_total_bytes="
+                                 f"{self.max_total_bytes}")
+            try:
+                stream.add_chunk(offset, chunk,
+                                 bool(stream_spec.get('final')))
+            except ValueError:
+                self._remove(stream_id)
+                raise
+            self._buffered_bytes += len(stream.buffer) - allocated
+            if stream_spec.get('final'):
+                stream.final_message = message_data
+            if not stream.complete:
+                return None
+            self._remove(stream_id)
+        message_data = stream.final_message
+        message_data['data']['audio_data'] = \
+            b64encode(stream.buffer).decode('utf-8')
+        LOG.debug(f"Reassembled audio stream {stream_id} "
+                  f"({stream.received_bytes} bytes)")
+        return message_data
+
+    def discard(self, stream_id: str):
+        """
+        Remove any buffered data for the specified stream
+        """
+        with self._lock:
+            self._remove(stream_id)
+
+    def prune(self):
+        """
+        Remove streams with no chunks received in `timeout` seconds
+        """
+        expiration = time.time() - self.timeout
+        with self._lock:
+            expired = [stream_id for stream_id, stream in
+                       self._streams.items()
+                       if stream.last_update < expiration]
+            for stream_id in expired:
+                LOG.warning(f"Discarding incomplete audio stream: {stream_id}")
+                self._remove(stream_id)
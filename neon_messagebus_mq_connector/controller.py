@@ -26,30 +26,43 @@
 # NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
 # SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
+import os
 import time
 import pika
 
-from ovos_bus_client.client import MessageBusClient
-from ovos_bus_client.message import Message
+from hashlib import sha256
+from threading import Lock
+from typing import TYPE_CHECKING, Dict, List, Optional
 from ovos_utils.log import LOG, log_deprecation
 from ovos_utils import create_daemon
-from neon_utils.metrics_utils import Stopwatch
-from neon_utils.socket_utils import b64_to_dict
-from ovos_config.config import Configuration
 from neon_mq_connector.connector import MQConnector, ConsumerThreadInstance
+from neon_mq_connector.utils.network_utils import b64_to_dict
+from neon_mq_connector.utils.thread_utils import RepeatingTimer
 from pydantic import ValidationError
-from neon_data_models.models.api.mq.neon import NeonApiMessage
-from neon_data_models.models.base.contexts import MQContext
+from neon_messagebus_mq_connector.audio_stream import AudioStreamReassembler
 from neon_messagebus_mq_connector.enums import NeonResponseTypes
+from neon_messagebus_mq_connector.metrics import ConsumerMetrics, \
+    LagMetrics, get_saturation_score
+from neon_messagebus_mq_connector.profiler import SamplingProfiler
+from neon_messagebus_mq_connector.publisher import PublishBatcher
+from neon_messagebus_mq_connector.request_cache import RequestCache
+from neon_messagebus_mq_connector.status import StatusServer
+
+if TYPE_CHECKING:
+    from ovos_bus_client.client import MessageBusClient
+    from ovos_bus_client.message import Message
 
 
 class ChatAPIProxy(MQConnector):
     """
     Proxy module for establishing connection between Neon Core and an MQ Broker
     """
+    duplicate_request_policies = ('respond', 'drop')
 
     def __init__(self, config: dict, service_name: str):
-        config = config or Configuration()
+        if not config:
+            from ovos_config.config import Configuration
+            config = Configuration()
         mq_config = config.get("MQ", config)
         super().__init__(mq_config, service_name)
         self.bus_config = config.get("websocket")
@@ -59,26 +72,376 @@ class ChatAPIProxy(MQConnector):
             self.bus_config = config.get("MESSAGEBUS")
         self._vhost = '/neon_chat_api'
         self._bus = None
-        self.connect_bus()
-        self.register_consumer(name=f'neon_api_request_{self.service_id}',
-                               vhost=self.vhost,
-                               queue=f'neon_chat_api_request_{self.service_id}',
-                               callback=self.handle_user_message,
-                               on_error=self.default_error_handler,
-                               auto_ack=False,
-                               restart_attempts=-1)
-        self.register_consumer(name='neon_request_consumer',
-                               vhost=self.vhost,
-                               queue='neon_chat_api_request',
-                               callback=self.handle_user_message,
-                               on_error=self.default_error_handler,
-                               auto_ack=False,
-                               restart_attempts=-1)
+        self._bus_thread = None
+        self.consumer_metrics: Dict[str, ConsumerMetrics] = dict()
+        self.audio_streams = AudioStreamReassembler(
+            timeout=self.audio_stream_timeout,
+            max_bytes=self.max_audio_stream_bytes,
+            max_streams=self.max_audio_streams,
+            max_total_bytes=self.max_audio_stream_total_bytes)
+        self._audio_stream_timer = None
+        self.request_lag = LagMetrics()
+        self._ident_waits = 0
+        self._ident_waits_lock = Lock()
+        self._queue_depths = dict()
+        self._queue_depths_updated = 0
+        self._queue_depths_lock = Lock()
+        self._status_server: Optional[StatusServer] = None
+        self._profiler: Optional[SamplingProfiler] = None
+        self.request_cache: Optional[RequestCache] = None
+        if self.duplicate_request_policy not in \
+                self.duplicate_request_policies:
+            LOG.error(f"Invalid duplicate_request_policy="
+                      f"{self.duplicate_request_policy}; expected one of "
+                      f"{self.duplicate_request_policies}. Using `respond`")
+            self.duplicate_request_policy = 'respond'
+        if self.request_cache_entries:
+            self.request_cache = RequestCache(
+                ttl=self.request_cache_ttl,
+                max_entries=self.request_cache_entries,
+                max_bytes=self.request_cache_bytes)
+        self.publish_batcher: Optional[PublishBatcher] = None
+        if self.publish_batch_window:
+            self.publish_batcher = PublishBatcher(
+                self._create_publish_connection,
+                window=float(self.publish_batch_window),
+                max_batch_size=self.publish_batch_size,
+                confirm=self.publish_batch_confirm,
+                max_pending=self.publish_batch_max_pending,
+                max_delay=self.publish_batch_max_delay,
+                fallback=self._publish_individually)
+            self.publish_batcher.start()
+        # Connect to the messagebus while MQ consumers are set up and started
+        self._bus_thread = create_daemon(self._connect_bus_and_preload,
+                                         autostart=True)
+        self.register_request_consumers(
+            name=f'neon_api_request_{self.service_id}',
+            vhost=self.vhost,
+            queue=self.service_queue,
+            count=self.consumer_count)
+        self.register_request_consumers(name='neon_request_consumer',
+                                        vhost=self.vhost,
+                                        queue='neon_chat_api_request',
+                                        count=self.consumer_count)
+        for additional_queue in self.additional_queues:
+            queue = additional_queue.get('queue')
+            if not queue:
+                LOG.error(f"Ignoring additional queue with no `queue` "
+                          f"defined: {additional_queue}")
+                continue
+            vhost = additional_queue.get('vhost') or self.vhost
+            self.register_request_consumers(
+                name=additional_queue.get('name') or
+                f'neon_request_consumer_{vhost.strip("/")}_{queue}',
+                vhost=vhost, queue=queue,
+                count=additional_queue.get('consumer_count',
+                                           self.consumer_count))
+        if self.admin_queue:
+            self.register_admin_consumer()
         self.response_timeouts = {
             NeonResponseTypes.TTS: 60,
             NeonResponseTypes.STT: 60
         }
 
+    @property
+    def service_configurable_properties(self) -> dict:
+        return {
+            # Number of consumer threads (each with its own channel) per queue
+            'consumer_count': 1,
+            # List of `{"queue": str, "vhost": str, "consumer_count": int}`
+            # specs to consume with `handle_user_message` in this process
+            'additional_queues': list(),
+            # Seconds to wait for the next chunk of a streamed audio request
+            'audio_stream_timeout': 30,
+            # Maximum decoded size of a streamed audio request
+            'max_audio_stream_bytes': 32 * 1024 * 1024,
+            # Maximum number and total size of incomplete audio streams
+            'max_audio_streams': 100,
+            'max_audio_stream_total_bytes': 256 * 1024 * 1024,
+            # Port to serve the HTTP status endpoint on (None to disable)
+            'status_port': None,
+            'status_host': '127.0.0.1',
+            # Seconds to cache queue depths queried from the broker
+            'status_cache_time': 5,
+            # Queue depth and request lag (seconds) considered saturated
+            'saturation_queue_depth': 100,
+            'saturation_lag': 5,
+            # Queue to consume admin requests from (None to disable) and the
+            # vhost it is on, which must not be used for user requests
+            'admin_queue': None,
+            'admin_vhost': None,
+            # Directory to write profiles to (defaults to the temp directory)
+            'profile_dir': None,
+            'profile_max_duration': 300,
+            # Max number of requests to remember for duplicate detection
+            # (0 to disable)
+            'request_cache_entries': 1000,
+            'request_cache_ttl': 60,
+            # Max total size of responses cached for duplicate requests
+            'request_cache_bytes': 16 * 1024 * 1024,
+            # Identify requests without a `message_id` by a hash of the
+            # request body; otherwise they are not checked for duplicates
+            'request_cache_hash_requests': False,
+            # `respond` to send cached responses to duplicate requests or
+            # `drop`
+            'duplicate_request_policy': 'respond',
+            # Max seconds to hold responses to batch publishing by routing
+            # key (0 to publish each response immediately)
+            'publish_batch_window': 0,
+            'publish_batch_size': 100,
+            # Commit each batch as a transaction to confirm it in one round
+            # trip
+            'publish_batch_confirm': False,
+            # Max responses waiting to be batched and max seconds to try
+            # publishing a batched response before publishing it with a new
+            # connection
+            'publish_batch_max_pending': 10000,
+            'publish_batch_max_delay': 1.0,
+        }
+
+    def post_run(self, **kwargs):
+        self._audio_stream_timer = RepeatingTimer(self.audio_stream_timeout,
+                                                  self.audio_streams.prune)
+        self._audio_stream_timer.daemon = True
+        self._audio_stream_timer.start()
+        if self.status_port is not None:
+            self._status_server = StatusServer(self.get_status,
+                                               self.status_host,
+                                               int(self.status_port))
+            self._status_server.start()
+
+    def stop(self):
+        if self._audio_stream_timer:
+            self._audio_stream_timer.cancel()
+            self._audio_stream_timer = None
+        if self._status_server:
+            self._status_server.stop()
+            self._status_server = None
+        if self.publish_batcher:
+            self.publish_batcher.stop()
+        super().stop()
+
+    @property
+    def service_queue(self) -> str:
+        """
+        Request queue consumed only by this instance
+        """
+        return f'neon_chat_api_request_{self.service_id}'
+
+    def register_request_consumers(self, name: str, vhost: str, queue: str,
+                                   count: int = 1) -> List[str]:
+        """
+        Register one or more consumers of `queue` that handle user requests.
+        Each consumer runs in its own thread with its own connection, so
+        handling of a slow request will not block the other consumers.
+        :param name: base name of the consumers
+        :param vhost: MQ vhost of the queue to consume
+        :param queue: MQ queue to consume
+        :param count: number of consumers to register for `queue`
+        :returns: list of registered consumer names
+        """
+        names = []
+        for idx in range(max(int(count), 1)):
+            consumer_name = name if idx == 0 else f'{name}_{idx}'
+            metrics = ConsumerMetrics(consumer_name, queue, vhost)
+            self.consumer_metrics[consumer_name] = metrics
+            self.register_consumer(name=consumer_name,
+                                   vhost=vhost,
+                                   queue=queue,
+                                   callback=metrics.wrap(
+                                       self.handle_user_message),
+                                   on_error=self.default_error_handler,
+                                   auto_ack=False,
+                                   restart_attempts=-1)
+            names.append(consumer_name)
+        return names
+
+    def get_consumer_metrics(self) -> List[dict]:
+        """
+        Get utilization metrics for each request consumer. Consistently high
+        utilization across consumers of a queue indicates that adding
+        consumers (or replicas) should increase throughput.
+        """
+        return [m.as_dict() for m in self.consumer_metrics.values()]
+
+    def register_admin_consumer(self):
+        """
+        Register a consumer for admin requests. Admin requests are only
+        accepted on a dedicated `admin_vhost` that is not also used for user
+        requests.
+        """
+        request_vhosts = {m.vhost for m in self.consumer_metrics.values()}
+        if not self.admin_vhost:
+            LOG.error("`admin_vhost` is not configured; "
+                      "admin requests are disabled")
+            return
+        if self.admin_vhost in request_vhosts:
+            LOG.error(f"Admin vhost {self.admin_vhost} is also a request "
+                      f"vhost; admin requests are disabled")
+            return
+        self.register_consumer(name='neon_admin_consumer',
+                               vhost=self.admin_vhost,
+                               queue=self.admin_queue,
+                               callback=self.handle_admin_message,
+                               on_error=self.default_error_handler,
+                               auto_ack=False,
+                               restart_attempts=-1)
+
+    def handle_admin_message(self,
+                             channel: pika.channel.Channel,
+                             method: pika.spec.Basic.Return,
+                             properties: pika.spec.BasicProperties,
+                             body: bytes):
+        """
+        Handles requests on the admin queue. Supported requests:
+        `neon.mq_connector.profile`: sample all threads in this process for
+            `data.duration` seconds (every `data.interval` seconds) and
+            respond with a summary of the most frequently sampled frames
+            and the path to the written collapsed stacks file
+
+        :param channel: MQ channel object (pika.channel.Channel)
+        :param method: MQ return method (pika.spec.Basic.Return)
+        :param properties: MQ properties (pika.spec.BasicProperties)
+        :param body: request body (bytes)
+        """
+        channel.basic_ack(method.delivery_tag)
+        request = b64_to_dict(body)
+        msg_type = request.get("msg_type")
+        if msg_type != "neon.mq_connector.profile":
+            LOG.warning(f"Ignoring unsupported admin request: {msg_type}")
+            return
+        if self._profiler and self._profiler.running:
+            self._send_admin_response(request, {"error": "Profiler is "
+                                                         "already running"})
+            return
+        data = request.get("data") or dict()
+        try:
+            duration = float(data.get("duration", 10))
+            interval = float(data.get("interval", 0.005))
+            if not (0 < duration and 0 < interval):
+                raise ValueError("`duration` and `interval` must be positive")
+        except (TypeError, ValueError) as e:
+            self._send_admin_response(request, {"error": repr(e)})
+            return
+        duration = min(duration, self.profile_max_duration)
+        self._profiler = SamplingProfiler(interval)
+        LOG.info(f"Starting profiler for {duration}s")
+        self._profiler.start(duration)
+        create_daemon(self._handle_profile_complete, args=(request,),
+                      autostart=True)
+
+    def _handle_profile_complete(self, request: dict):
+        """
+        Wait for the running profiler to finish and respond to the request
+        that started it.
+        @param request: admin request that started the profiler
+        """
+        profiler = self._profiler
+        profiler.join()
+        path = None
+        if self.profile_dir:
+            path = os.path.join(os.path.expanduser(self.profile_dir),
+                                f"neon_mq_connector_{self.service_id}_"
+                                f"{int(time.time())}.collapsed")
+        try:
+            path = profiler.write_collapsed(path)
+        except OSError as e:
+            LOG.error(f"Failed to write profile: {e}")
+            path = None
+        self._send_admin_response(request, {"path": path,
+                                            "samples": profiler.samples,
+                                            "interval": profiler.interval,
+                                            "truncated": profiler.truncated,
+                                            "summary": profiler.summary()})
+
+    def _send_admin_response(self, request: dict, data: dict):
+        """
+        Publish a response to an admin request on the admin vhost
+        @param request: admin request being responded to
+        @param data: response data
+        """
+        context = request.get("context") or dict()
+        routing_key = context.get("mq", {}).get("routing_key") or \
+            f"{self.admin_queue}_response"
+        self.send_message(request_data={
+            "msg_type": f"{request.get('msg_type')}.response",
+            "data": {"service_id": self.service_id, **data},
+            "context": context}, vhost=self.admin_vhost,
+            queue=routing_key)
+
+    def get_queue_depths(self) -> Dict[str, dict]:
+        """
+        Get the number of messages waiting in each consumed queue. Values are
+        cached for `status_cache_time` seconds to bound load on the broker.
+        :returns: dict of `vhost:queue` to `messages` and `consumers` counts
+        """
+        with self._queue_depths_lock:
+            if time.time() - self._queue_depths_updated < \
+                    self.status_cache_time:
+                return self._queue_depths
+            queues = dict()
+            for metrics in self.consumer_metrics.values():
+                queues.setdefault(metrics.vhost, set()).add(metrics.queue)
+            depths = dict()
+            for vhost, vhost_queues in queues.items():
+                try:
+                    with pika.BlockingConnection(
+                            self.get_connection_params(vhost)) as connection:
+                        channel = connection.channel()
+                        for queue in vhost_queues:
+                            declared = channel.queue_declare(queue,
+                                                             passive=True)
+                            depths[f'{vhost}:{queue}'] = {
+                                "messages": declared.method.message_count,
+                                "consumers": declared.method.consumer_count}
+                except Exception as e:
+                    LOG.error(f"Failed to get queue depths on {vhost}: {e}")
+            self._queue_depths = depths
+            self._queue_depths_updated = time.time()
+            return self._queue_depths
+
+    def get_status(self) -> dict:
+        """
+        Get a summary of this connector's readiness and load for use by
+        orchestrators. `saturation` >= 1.0 indicates that this connector is
+        not keeping up with requests.
+        """
+        consumers = dict()
+        for name, consumer in dict(self.consumers).items():
+            consumers[name] = {"alive": consumer.is_alive(),
+                               "consuming": consumer.is_consuming}
+        bus_connected = bool(self._bus and self._bus.connected_event.is_set())
+        queue_depths = self.get_queue_depths()
+        consumer_metrics = self.get_consumer_metrics()
+        utilization_by_queue = dict()
+        for metrics in consumer_metrics:
+            utilization_by_queue.setdefault(
+                f'{metrics["vhost"]}:{metrics["queue"]}', []).append(
+                metrics["recent_utilization"])
+        utilization = max((sum(u) / len(u) for u in
+                           utilization_by_queue.values()), default=0.0)
+        lag = self.request_lag.as_dict()
+        saturation = get_saturation_score(
+            utilization=utilization,
+            queue_depth=sum(q["messages"] for q in queue_depths.values()),
+            lag=lag["recent"],
+            target_queue_depth=self.saturation_queue_depth,
+            target_lag=self.saturation_lag)
+        return {"ready": bus_connected and self.check_health(),
+                "bus_connected": bus_connected,
+                "consumers": consumers,
+                "consumer_metrics": consumer_metrics,
+                "queues": queue_depths,
+                "request_lag": lag,
+                "ident_waits": self._ident_waits,
+                "audio_streams": self.audio_streams.active_streams,
+                "audio_stream_bytes": self.audio_streams.buffered_bytes,
+                "request_cache": self.request_cache.as_dict()
+                if self.request_cache else None,
+                "publish_batcher": self.publish_batcher.as_dict()
+                if self.publish_batcher else None,
+                "saturation": saturation}
+
     @staticmethod
     def default_error_handler(thread: ConsumerThreadInstance,
                               exception: Exception):
@@ -110,6 +473,7 @@ class ChatAPIProxy(MQConnector):
         :param refresh: To refresh existing connection
         """
         if not self._bus or refresh:
+            from ovos_bus_client.client import MessageBusClient
             self._bus = MessageBusClient(host=self.bus_config['host'],
                                          port=int(self.bus_config.get('port',
                                                                       8181)),
@@ -118,22 +482,38 @@ class ChatAPIProxy(MQConnector):
             self.register_bus_handlers()
             self._bus.run_in_thread()
 
+    def _connect_bus_and_preload(self):
+        """
+        Connect to the messagebus and import modules used to handle messages
+        so that this is not done in the first call to a message handler.
+        """
+        try:
+            self.connect_bus()
+        except Exception as e:
+            LOG.error(f"Failed to connect to messagebus: {e}")
+        import neon_data_models.models.api.mq.neon  # noqa
+        import neon_utils.metrics_utils  # noqa
+
     @property
-    def bus(self) -> MessageBusClient:
+    def bus(self) -> 'MessageBusClient':
         """
         Connects to Message Bus if no connection was established
         :return: connected message bus client instance
         """
+        if self._bus_thread and self._bus_thread.is_alive():
+            self._bus_thread.join()
         if not self._bus:
             self.connect_bus()
         return self._bus
 
-    def handle_neon_message(self, message: Message):
+    def handle_neon_message(self, message: 'Message'):
         """
         Handles responses from Neon Core, optionally reformatting response data
         before forwarding to the MQ bus.
         :param message: Received Message object
         """
+        from neon_data_models.models.api.mq.neon import NeonApiMessage
+        from neon_utils.metrics_utils import Stopwatch
         response_handled = time.time()
         _stopwatch = Stopwatch()
         with _stopwatch:
@@ -162,14 +542,61 @@ class ChatAPIProxy(MQConnector):
                 response_message.context.timing.response_sent.timestamp()
         response_message.context.timing.mq_response_handler = _stopwatch.time
 
+        response_data = response_message.model_dump()
+        routing_key = response_message.routing_key
+        mq_context = message.context.get('mq', {})
+        body = None
+        # Responses are only needed to respond to duplicate requests
+        if self.request_cache and mq_context.get('message_id') and \
+                self.duplicate_request_policy == 'respond':
+            # Serialize once to measure the response and to publish it
+            body = PublishBatcher.serialize(response_data)
+            self.request_cache.add_response(
+                (mq_context.get('routing_key'), mq_context['message_id']),
+                response_data, len(body))
         LOG.debug(f"Sending message ({message.msg_type}) with "
-                  f"routing_key={response_message.routing_key}")
-        self.send_message(request_data=response_message.model_dump(),
-                           queue=response_message.routing_key)
-        LOG.debug(
-            f"Sent message with routing_key={response_message.routing_key}")
+                  f"routing_key={routing_key}")
+        self.publish_response(response_data, routing_key, body)
+        LOG.debug(f"Sent message with routing_key={routing_key}")
+
+    def _create_publish_connection(self) -> pika.BlockingConnection:
+        """
+        Create a connection for publishing responses outside of
+        `send_message`. Unlike `create_mq_connection`, this is not retried so
+        that a broker outage can't hold up responses queued behind it.
+        """
+        timeout = float(self.publish_batch_max_delay)
+        return pika.BlockingConnection(self.get_connection_params(
+            self.vhost, connection_attempts=1, socket_timeout=timeout,
+            stack_timeout=timeout, blocked_connection_timeout=timeout))
+
+    def _publish_individually(self, request_data: dict, routing_key: str):
+        """
+        Publish a response the publish batcher could not publish with a new
+        connection. Unlike `send_message`, this is not retried.
+        :param request_data: serialized response message
+        :param routing_key: queue to publish the response to
+        """
+        with self._create_publish_connection() as connection:
+            self.emit_mq_message(connection, request_data=request_data,
+                                 queue=routing_key)
+
+    def publish_response(self, response_data: dict, routing_key: str,
+                         body: Optional[bytes] = None):
+        """
+        Publish a response to a client, batched with other responses if
+        `publish_batch_window` is configured.
+        :param response_data: serialized response message
+        :param routing_key: queue to publish the response to
+        :param body: `response_data` serialized with
+            `PublishBatcher.serialize`, if available
+        """
+        if self.publish_batcher and self.publish_batcher.running:
+            self.publish_batcher.publish(response_data, routing_key, body)
+        else:
+            self.send_message(request_data=response_data, queue=routing_key)
 
-    def handle_neon_profile_update(self, message: Message):
+    def handle_neon_profile_update(self, message: 'Message'):
         """
         Handles profile updates from Neon Core. Ensures routing_key is defined
         to avoid publishing private profile values to a shared queue
@@ -198,7 +625,7 @@ class ChatAPIProxy(MQConnector):
         return None, msg_data
 
     @staticmethod
-    def validate_message_context(message: Message) -> bool:
+    def validate_message_context(message: 'Message') -> bool:
         """
         Validates message context so its relevant data could be fetched once
         a response is received
@@ -221,6 +648,9 @@ class ChatAPIProxy(MQConnector):
         :param body: request body (bytes)
 
         """
+        from neon_data_models.models.api.mq.neon import NeonApiMessage
+        from neon_data_models.models.base.contexts import MQContext
+        from neon_utils.metrics_utils import Stopwatch
         input_received = time.time()
         LOG.debug(f"Handle delivery_tag={method.delivery_tag}")
         if not isinstance(body, bytes):
@@ -231,9 +661,18 @@ class ChatAPIProxy(MQConnector):
         _stopwatch = Stopwatch()
         _stopwatch.start()
         dict_data = b64_to_dict(body)
+        if self.audio_streams.is_chunk(dict_data):
+            dict_data = self._handle_audio_chunk(dict_data,
+                                                 method.routing_key)
+            if not dict_data:
+                # Wait for the rest of the stream
+                _stopwatch.stop()
+                return
         LOG.info(f'Received user message: {dict_data.get("msg_type")}|'
-            f'data={dict_data["data"].keys()}|'
+            f'data={(dict_data.get("data") or {}).keys()}|'
             f'context={dict_data["context"].keys()}')
+        check_duplicate = bool(self.request_cache) and \
+            self._set_request_key(dict_data, body)
         try:
             # TODO: Klat context was previously required for audio responses.
             # These are now handled for any response with `MQ` context.
@@ -247,23 +686,21 @@ class ChatAPIProxy(MQConnector):
                 neon_api_message.context.mq = MQContext(**dict_data)
 
         except ValidationError as e:
-            LOG.error(e)
-            # This Message is malformed
-            context = dict_data.pop("context")
-            response = Message("klat.error", {"error": repr(e),
-                                              "data": dict_data},
-                               context)
-            response.context.setdefault("klat_data", {})
-            response.context['klat_data'].setdefault('routing_key',
-                                                     'neon_chat_api_error')
-            self.handle_neon_message(response)
+            self._handle_invalid_request(dict_data, e)
+            _stopwatch.stop()
+            return
+
+        if check_duplicate and \
+                self._handle_duplicate_request(neon_api_message):
             _stopwatch.stop()
             return
 
         # Add timing metrics
         if neon_api_message.context.timing.client_sent:
-            neon_api_message.context.timing.mq_from_client = \
-                input_received - neon_api_message.context.timing.client_sent.timestamp()
+            request_lag = input_received - \
+                neon_api_message.context.timing.client_sent.timestamp()
+            neon_api_message.context.timing.mq_from_client = request_lag
+            self.request_lag.record(request_lag)
 
         _stopwatch.stop()
         neon_api_message.context.timing.mq_input_handler = _stopwatch.time
@@ -287,14 +724,125 @@ class ChatAPIProxy(MQConnector):
             self.bus.emit(message)
         LOG.debug(f"Handler Complete in {time.time() - input_received}s")
 
-    def _get_messagebus_response(self, message: Message):
+    def _handle_audio_chunk(self, dict_data: dict,
+                            queue: str) -> Optional[dict]:
+        """
+        Add a chunk of a streamed audio request. Chunks of a stream must all
+        be handled by the same instance, so only the first chunk (offset 0)
+        is accepted from a shared queue; the client is then sent a
+        `neon.audio_stream.queue` message with the `service_queue` to send
+        the remaining chunks to.
+        :param dict_data: deserialized request containing an audio chunk
+        :param queue: name of the queue the chunk was consumed from
+        :returns: reassembled request if this chunk completed the stream
+        """
+        context = dict_data.get('context') or dict()
+        try:
+            stream_id = dict_data['data']['stream'].get('stream_id')
+            offset = int(dict_data['data']['stream'].get('offset', 0))
+            if queue != self.service_queue and offset != 0:
+                raise ValueError(f"Chunks of audio stream {stream_id} after "
+                                 f"the first must be sent to the queue from "
+                                 f"`neon.audio_stream.queue`")
+            result = self.audio_streams.add_chunk(dict_data)
+        except (ValueError, TypeError) as e:
+            self._handle_invalid_request(dict_data, e)
+            return None
+        if result is None and queue != self.service_queue:
+            routing_key = dict_data.get('routing_key') or \
+                context.get('mq', {}).get('routing_key')
+            if routing_key:
+                self.publish_response({"msg_type": "neon.audio_stream.queue",
+                                       "data": {"stream_id": stream_id,
+                                                "queue": self.service_queue},
+                                       "context": context}, routing_key)
+            else:
+                LOG.warning(f"No routing_key to respond to audio stream "
+                            f"{stream_id}")
+        return result
+
+    def _set_request_key(self, dict_data: dict, body: bytes) -> bool:
+        """
+        Ensure a request has an `mq.message_id` (or, for legacy requests, a
+        top-level `message_id`) that identifies it in the request cache. If `request_cache_hash_requests` is enabled, requests without
+        one are identified by a hash of the request body, which will match
+        retries or redeliveries of the same request.
+        :param dict_data: deserialized request data to update
+        :param body: serialized request
+        :returns: True if the request has a key to check for duplicates
+        """
+        mq_context = dict_data['context'].get('mq')
+        if mq_context and mq_context.get('message_id'):
+            return True
+        if dict_data.get('message_id'):
+            if mq_context:
+                # `mq` context is used as-is, so a `message_id` would be
+                # generated for it
+                mq_context['message_id'] = dict_data['message_id']
+            return True
+        if not self.request_cache_hash_requests:
+            return False
+        request_key = sha256(body).hexdigest()
+        if mq_context:
+            mq_context['message_id'] = request_key
+        else:
+            dict_data['message_id'] = request_key
+        return True
+
+    def _handle_duplicate_request(self, request) -> bool:
+        """
+        Check if a request was already handled and, if so, respond to it
+        according to `duplicate_request_policy`. Requests are only duplicates
+        of requests with the same `message_id` and `routing_key`, so that
+        responses are never sent to a different client.
+        :param request: parsed request
+        :returns: True if the request is a duplicate and should not be handled
+        """
+        request_id = request.context.mq.message_id
+        routing_key = request.context.mq.routing_key
+        policy = self.duplicate_request_policy
+        duplicate, responses = self.request_cache.check(
+            (routing_key, request_id))
+        if not duplicate:
+            return False
+        LOG.info(f"Handling duplicate request {request_id} with "
+                 f"policy={policy}")
+        if policy == 'respond' and routing_key:
+            for response in responses:
+                self.publish_response(response, routing_key)
+        return True
+
+    def _handle_invalid_request(self, dict_data: dict, error: Exception):
+        """
+        Respond to a malformed request with a `klat.error` message
+        :param dict_data: deserialized request data
+        :param error: Exception raised while parsing `dict_data`
+        """
+        from ovos_bus_client.message import Message
+        LOG.error(error)
+        context = dict_data.pop("context")
+        response = Message("klat.error", {"error": repr(error),
+                                          "data": dict_data},
+                           context)
+        response.context.setdefault("klat_data", {})
+        response.context['klat_data'].setdefault('routing_key',
+                                                 'neon_chat_api_error')
+        self.handle_neon_message(response)
+
+    def _get_messagebus_response(self, message: 'Message'):
         """
         Helper method to get a response on the Messagebus that can be threaded
         so as not to block MQ handling.
         @param message: Message object to get a response for
         """
-        resp = self.bus.wait_for_response(message,
-                                          message.context['ident'], 30)
+        with self._ident_waits_lock:
+            self._ident_waits += 1
+        try:
+            resp = self.bus.wait_for_response(message,
+                                              message.context['ident'], 30)
+        finally:
+            with self._ident_waits_lock:
+                self._ident_waits -= 1
         if resp:
             # Override msg_type for handler; context contains routing
             resp.msg_type = f"{message.msg_type}.response"
@@ -303,7 +851,7 @@ class ChatAPIProxy(MQConnector):
             LOG.warning(f"No response to: {message.msg_type}")
 
     def format_response(self, response_type: NeonResponseTypes,
-                        message: Message) -> dict:
+                        message: 'Message') -> dict:
         """
         Reformat received response by Neon API for Klat based on type
         :param response_type: response type from NeonResponseTypes Enum
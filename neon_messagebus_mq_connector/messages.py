@@ -28,20 +28,41 @@
 
 
 from ovos_utils.log import log_deprecation
-from neon_data_models.models.base.messagebus import \
-    BaseMessage as MessageModel
-from neon_data_models.models.api.messagebus import \
-    NeonTextInput as RecognizerMessage, NeonGetStt as STTMessage, \
-    NeonGetTts as TTSMessage, NeonAudioInput as AudioInput
 
+_MODELS = {
+    "MessageModel": ("neon_data_models.models.base.messagebus", "BaseMessage"),
+    "RecognizerMessage": ("neon_data_models.models.api.messagebus",
+                          "NeonTextInput"),
+    "STTMessage": ("neon_data_models.models.api.messagebus", "NeonGetStt"),
+    "TTSMessage": ("neon_data_models.models.api.messagebus", "NeonGetTts"),
+    "AudioInput": ("neon_data_models.models.api.messagebus", "NeonAudioInput"),
+}
+_TEMPLATES = {
+    "stt": "STTMessage",
+    "tts": "TTSMessage",
+    "audio_input": "AudioInput",
+    "recognizer": "RecognizerMessage",
+    "message": "MessageModel"
+}
+_deprecation_logged = False
 
-log_deprecation("Import from `neon_data_models.models.messagebus` directly",
-                "2.0.0")
 
-templates = {
-    "stt": STTMessage,
-    "tts": TTSMessage,
-    "audio_input": AudioInput,
-    "recognizer": RecognizerMessage,
-    "message": MessageModel
-}
+def __getattr__(name: str):
+    # Models are imported (and the deprecation logged) on first access rather
+    # than when this module is imported
+    global _deprecation_logged
+    from importlib import import_module
+    if name == "templates":
+        value = {key: __getattr__(model)
+                 for key, model in _TEMPLATES.items()}
+    elif name in _MODELS:
+        if not _deprecation_logged:
+            log_deprecation("Import from `neon_data_models.models.messagebus` "
+                            "directly", "2.0.0")
+            _deprecation_logged = True
+        module, attr = _MODELS[name]
+        value = getattr(import_module(module), attr)
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value
+    return value
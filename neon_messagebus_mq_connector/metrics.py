@@ -0,0 +1,229 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Framework
+# All trademark and other rights reserved by their respective owners
+# Copyright 2008-2025 Neongecko.com Inc.
+# Contributors: Daniel McKnight, Guy Daniels, Elon Gasper, Richard Leeds,
+# Regina Bloomstine, Casimiro Ferreira, Andrii Pernatii, Kirill Hrymailo
+# BSD-3 License
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from this
+#    software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS  BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS;  OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import time
+
+from threading import Lock
+from typing import Callable
+
+
+class ConsumerMetrics:
+    """
+    Tracks utilization of a single MQ consumer thread
+    """
+
+    def __init__(self, name: str, queue: str, vhost: str,
+                 window: float = 60):
+        """
+        :param name: name of the consumer
+        :param queue: name of the consumed queue
+        :param vhost: vhost of the consumed queue
+        :param window: seconds over which `recent_utilization` is calculated
+        """
+        self.name = name
+        self.queue = queue
+        self.vhost = vhost
+        self.started = time.time()
+        self.messages_handled = 0
+        self.errors = 0
+        self.busy_time = 0.0
+        self.last_handled = None
+        self.window = window
+        self._window_start = self.started
+        self._window_busy = 0.0
+        self._last_window_utilization = None
+        self._lock = Lock()
+
+    def wrap(self, callback: Callable) -> Callable:
+        """
+        Wrap a consumer callback so that calls to it are timed
+        :param callback: consumer `on_message` callback
+        :returns: callback that records metrics before returning
+        """
+        def _metered_callback(*args, **kwargs):
+            start = time.time()
+            success = False
+            try:
+                callback(*args, **kwargs)
+                success = True
+            finally:
+                self.record(time.time() - start, success)
+        return _metered_callback
+
+    def record(self, duration: float, success: bool = True):
+        """
+        Record a handled message
+        :param duration: seconds spent handling the message
+        :param success: False if handling raised an exception
+        """
+        with self._lock:
+            self._roll_window()
+            self.messages_handled += 1
+            self.busy_time += duration
+            self._window_busy += duration
+            self.last_handled = time.time()
+            if not success:
+                self.errors += 1
+
+    def _roll_window(self):
+        now = time.time()
+        elapsed = now - self._window_start
+        if elapsed >= self.window:
+            if elapsed >= 2 * self.window:
+                # No messages were handled in the last full window
+                self._last_window_utilization = 0.0
+            else:
+                self._last_window_utilization = \
+                    min(self._window_busy / elapsed, 1.0)
+            self._window_start = now
+            self._window_busy = 0.0
+
+    @property
+    def recent_utilization(self) -> float:
+        """
+        Fraction of the last complete `window` spent handling messages; this
+        is the current partial window until one has elapsed.
+        """
+        with self._lock:
+            self._roll_window()
+            if self._last_window_utilization is not None:
+                return self._last_window_utilization
+            elapsed = time.time() - self._window_start
+            return min(self._window_busy / elapsed, 1.0) if elapsed > 0 \
+                else 0.0
+
+    @property
+    def utilization(self) -> float:
+        """
+        Fraction of time since this consumer was created spent handling
+        messages. Values approaching 1.0 mean this consumer is saturated.
+        """
+        elapsed = time.time() - self.started
+        if elapsed <= 0:
+            return 0.0
+        return min(self.busy_time / elapsed, 1.0)
+
+    def as_dict(self) -> dict:
+        recent_utilization = self.recent_utilization
+        with self._lock:
+            return {"name": self.name,
+                    "queue": self.queue,
+                    "vhost": self.vhost,
+                    "messages_handled": self.messages_handled,
+                    "errors": self.errors,
+                    "busy_time": round(self.busy_time, 6),
+                    "mean_handle_time": round(
+                        self.busy_time / self.messages_handled, 6)
+                    if self.messages_handled else 0.0,
+                    "last_handled": self.last_handled,
+                    "utilization": round(self.utilization, 6),
+                    "recent_utilization": round(recent_utilization, 6)}
+
+
+class LagMetrics:
+    """
+    Tracks the delay between a client sending a request and a consumer
+    receiving it
+    """
+
+    def __init__(self, smoothing: float = 0.2, window: float = 60):
+        """
+        :param smoothing: weight of the newest sample in the moving average
+        :param window: seconds after the last sample that `recent` reports
+            the moving average; after this the average is considered stale
+        """
+        self.smoothing = smoothing
+        self.window = window
+        self.samples = 0
+        self.last = None
+        self.last_recorded = None
+        self.average = None
+        self.max = None
+        self._lock = Lock()
+
+    def record(self, lag: float):
+        """
+        Record the lag of a received request
+        :param lag: seconds between client send and consumer receipt
+        """
+        with self._lock:
+            now = time.time()
+            self.samples += 1
+            self.last = lag
+            self.max = lag if self.max is None else max(self.max, lag)
+            if self.average is None or self._is_stale(now):
+                # Don't blend new samples with a stale average
+                self.average = lag
+            else:
+                self.average = self.smoothing * lag + \
+                    (1 - self.smoothing) * self.average
+            self.last_recorded = now
+
+    def _is_stale(self, now: float) -> bool:
+        return self.last_recorded is None or \
+            now - self.last_recorded >= self.window
+
+    @property
+    def recent(self) -> float:
+        """
+        Moving average lag if a request was received in the last `window`,
+        else 0.0 so that an idle connector is not reported as lagging.
+        """
+        with self._lock:
+            if self.average is None or self._is_stale(time.time()):
+                return 0.0
+            return self.average
+
+    def as_dict(self) -> dict:
+        recent = self.recent
+        with self._lock:
+            return {"samples": self.samples,
+                    "last": self.last,
+                    "average": self.average,
+                    "recent": recent,
+                    "max": self.max}
+
+
+def get_saturation_score(utilization: float, queue_depth: int, lag: float,
+                         target_queue_depth: int, target_lag: float) -> float:
+    """
+    Compute a score describing how close a connector is to saturation, where
+    values >= 1.0 indicate more consumers (or replicas) are needed.
+    :param utilization: recent fraction of time consumers are busy
+    :param queue_depth: number of messages waiting in consumed queues
+    :param lag: recent seconds between client send and consumer receipt
+    :param target_queue_depth: queue depth considered saturated
+    :param target_lag: lag considered saturated
+    :returns: the largest of the normalized saturation signals
+    """
+    scores = [utilization]
+    if target_queue_depth:
+        scores.append(queue_depth / target_queue_depth)
+    if target_lag and lag:
+        scores.append(max(lag, 0.0) / target_lag)
+    return round(max(scores), 6)
@@ -0,0 +1,166 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Framework
+# All trademark and other rights reserved by their respective owners
+# Copyright 2008-2025 Neongecko.com Inc.
+# Contributors: Daniel McKnight, Guy Daniels, Elon Gasper, Richard Leeds,
+# Regina Bloomstine, Casimiro Ferreira, Andrii Pernatii, Kirill Hrymailo
+# BSD-3 License
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from this
+#    software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS  BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS;  OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import os
+import sys
+import threading
+import time
+
+from collections import Counter
+from tempfile import gettempdir
+from typing import Dict, List, Optional
+from ovos_utils.log import LOG
+
+# Shortest allowed time between samples, to keep profiling overhead low
+MIN_SAMPLE_INTERVAL = 0.001
+
+
+class SamplingProfiler:
+    """
+    Low-overhead statistical profiler that periodically samples the stacks
+    of all running threads in this process and aggregates them as collapsed
+    stacks (the input format for `flamegraph.pl` and speedscope).
+    """
+
+    def __init__(self, interval: float = 0.005, max_stacks: int = 10000):
+        """
+        :param interval: seconds between stack samples (at least
+            `MIN_SAMPLE_INTERVAL`)
+        :param max_stacks: max number of distinct stacks to record; samples
+            of other stacks are counted as `<thread>;[truncated]`
+        """
+        self.interval = max(float(interval), MIN_SAMPLE_INTERVAL)
+        self.max_stacks = max_stacks
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.truncated = 0
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return bool(self._thread and self._thread.is_alive())
+
+    @staticmethod
+    def _format_frame(frame) -> str:
+        code = frame.f_code
+        return f"{code.co_name} ({os.path.basename(code.co_filename)}:" \
+               f"{code.co_firstlineno})"
+
+    def sample(self):
+        """
+        Record the current stack of every thread other than the calling one
+        """
+        thread_names = {t.ident: t.name for t in threading.enumerate()}
+        current = threading.get_ident()
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == current:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(self._format_frame(frame))
+                frame = frame.f_back
+            thread_name = thread_names.get(thread_id, str(thread_id))
+            stack.append(thread_name)
+            stack = ';'.join(reversed(stack))
+            if stack not in self.stacks and \
+                    len(self.stacks) >= self.max_stacks:
+                self.truncated += 1
+                stack = f"{thread_name};[truncated]"
+            self.stacks[stack] += 1
+        self.samples += 1
+
+    def _run(self, duration: float):
+        end = time.monotonic() + duration
+        while not self._stop_event.is_set() and time.monotonic() < end:
+            self.sample()
+            self._stop_event.wait(self.interval)
+
+    def start(self, duration: float):
+        """
+        Sample in a background thread for `duration` seconds
+        """
+        if self.running:
+            raise RuntimeError("Profiler is already running")
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, args=(duration,),
+                                        daemon=True, name="sampling_profiler")
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def join(self, timeout: Optional[float] = None):
+        if self._thread:
+            self._thread.join(timeout)
+
+    def profile(self, duration: float):
+        """
+        Sample for `duration` seconds, blocking until complete
+        """
+        self.start(duration)
+        self.join()
+
+    def write_collapsed(self, path: Optional[str] = None) -> str:
+        """
+        Write collected samples in collapsed stack format
+        :param path: output file path (default is a timestamped file in the
+            system temp directory)
+        :returns: path to the written file
+        """
+        path = path or os.path.join(gettempdir(),
+                                    f"neon_mq_connector_{int(time.time())}"
+                                    f".collapsed")
+        with open(path, 'w') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        LOG.info(f"Wrote profile with {self.samples} samples to {path}")
+        return path
+
+    def summary(self, limit: int = 10) -> Dict[str, List[dict]]:
+        """
+        Summarize the most frequently sampled frames
+        :param limit: max number of frames to include in each list
+        :returns: dict of `self` (frames at the top of the stack) and
+            `total` (frames anywhere in the stack) sample counts
+        """
+        self_counts = Counter()
+        total_counts = Counter()
+        for stack, count in self.stacks.items():
+            frames = stack.split(';')[1:]
+            if not frames:
+                continue
+            self_counts[frames[-1]] += count
+            for frame in set(frames):
+                total_counts[frame] += count
+        samples = self.samples or 1
+        return {key: [{"frame": frame, "samples": count,
+                       "ratio": round(count / samples, 4)}
+                      for frame, count in counts.most_common(limit)]
+                for key, counts in (("self", self_counts),
+                                    ("total", total_counts))}
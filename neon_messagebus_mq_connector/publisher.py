@@ -0,0 +1,406 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Framework
+# All trademark and other rights reserved by their respective owners
+# Copyright 2008-2025 Neongecko.com Inc.
+# Contributors: Daniel McKnight, Guy Daniels, Elon Gasper, Richard Leeds,
+# Regina Bloomstine, Casimiro Ferreira, Andrii Pernatii, Kirill Hrymailo
+# BSD-3 License
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from this
+#    software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS  BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS;  OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import time
+
+from collections import OrderedDict, deque
+from threading import Condition, Lock, Thread
+from typing import Callable, Dict, List, Optional, Tuple
+from uuid import uuid4
+
+import pika
+
+from neon_mq_connector.utils.network_utils import b64_to_dict, dict_to_b64
+from ovos_utils.log import LOG
+
+# Upper bound on `window` so batching can never add more than this latency
+MAX_BATCH_WINDOW = 0.05
+
+
+class PublishBatcher:
+    """
+    Collects messages to publish and sends them over a single persistent
+    channel in batches. A batch is published when the oldest pending message
+    has waited `window` seconds or `max_batch_size` messages are pending.
+    Messages to the same routing key are published in the order they were
+    queued.
+
+    Messages that cannot be published by the batcher within `max_delay`
+    seconds (i.e. while the connection is down) are passed to `fallback` on
+    a separate thread instead, or counted as errors if no `fallback` is
+    provided. While a routing key has messages waiting for `fallback`, later
+    messages to it are also passed to `fallback` so they stay in order.
+
+    At most `max_pending` messages are held; `publish` blocks for up to
+    `max_delay` seconds for space and then drops the message as an error.
+    """
+
+    def __init__(self,
+                 connection_factory: Callable[[], pika.BlockingConnection],
+                 window: float = 0.002, max_batch_size: int = 100,
+                 confirm: bool = False, expiration: int = 1000,
+                 max_pending: int = 10000, max_delay: float = 1.0,
+                 fallback: Optional[Callable[[dict, str], None]] = None):
+        """
+        :param connection_factory: method returning a new MQ connection. This
+            should make a single connection attempt that times out within
+            `max_delay`
+        :param window: max seconds a message waits before being published
+        :param max_batch_size: max number of messages in one batch
+        :param confirm: if True, commit each batch as a transaction so the
+            whole batch is confirmed by the broker in one round trip
+        :param expiration: published message expiration in milliseconds
+        :param max_pending: max number of messages waiting to be published
+        :param max_delay: max seconds after a message is queued that the
+            batcher will attempt to publish it. After a failed publish, no
+            new connection is attempted for this long
+        :param fallback: method called with `request_data` and `routing_key`
+            to publish a message the batcher could not publish. This should
+            make a single attempt that times out within `max_delay`
+        """
+        if window > MAX_BATCH_WINDOW:
+            LOG.warning(f"Limiting batch window to {MAX_BATCH_WINDOW}s")
+            window = MAX_BATCH_WINDOW
+        self.window = window
+        self.max_batch_size = max(int(max_batch_size), 1)
+        self.confirm = confirm
+        self.expiration = str(expiration)
+        self.max_pending = max(int(max_pending), self.max_batch_size)
+        self.max_delay = max(float(max_delay), window)
+        self.heartbeat_interval = 1.0
+        self._connection_factory = connection_factory
+        self._fallback = fallback
+        self._reconnect_at = 0.0
+        self._connection: Optional[pika.BlockingConnection] = None
+        self._channel = None
+        self._declared_queues = set()
+        self._pending: Dict[str, List[Tuple[float, bytes]]] = OrderedDict()
+        self._pending_count = 0
+        self._oldest = None
+        lock = Lock()
+        self._condition = Condition(lock)
+        self._space_available = Condition(lock)
+        self._fallback_ready = Condition(lock)
+        self._fallback_queue = deque()
+        self._fallback_keys: Dict[str, int] = dict()
+        self._stopping = False
+        self._thread: Optional[Thread] = None
+        self._fallback_thread: Optional[Thread] = None
+
+        self.batches = 0
+        self.messages = 0
+        self.errors = 0
+        self.fallbacks = 0
+        self.max_wait = 0.0
+        self._total_wait = 0.0
+
+    @property
+    def running(self) -> bool:
+        return bool(self._thread and self._thread.is_alive())
+
+    def start(self):
+        self._stopping = False
+        self._thread = Thread(target=self._run, daemon=True,
+                              name="publish_batcher")
+        self._thread.start()
+        if self._fallback:
+            self._fallback_thread = Thread(target=self._run_fallback,
+                                           daemon=True,
+                                           name="publish_fallback")
+            self._fallback_thread.start()
+
+    def stop(self, timeout: float = 3):
+        """
+        Publish any pending messages and stop the publishing thread
+        """
+        with self._condition:
+            self._stopping = True
+            self._condition.notify()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+        with self._condition:
+            self._fallback_ready.notify()
+        if self._fallback_thread:
+            self._fallback_thread.join(timeout)
+            self._fallback_thread = None
+
+    @staticmethod
+    def serialize(request_data: dict) -> bytes:
+        """
+        Serialize a message to publish, adding a `message_id` if it has none
+        :param request_data: dict message to publish
+        :returns: message body
+        """
+        request_data = dict(request_data)
+        if request_data.get('message_id') is None:
+            request_data['message_id'] = \
+                request_data.get("context", {}).get("mq", {}).get(
+                    "message_id") or uuid4().hex
+        return dict_to_b64(request_data)
+
+    def publish(self, request_data: dict, routing_key: str,
+                body: Optional[bytes] = None):
+        """
+        Queue a message to be published
+        :param request_data: dict message to publish
+        :param routing_key: queue to publish to
+        :param body: `request_data` already serialized with `serialize`
+        """
+        if body is None:
+            body = self.serialize(request_data)
+        queued = time.monotonic()
+        with self._condition:
+            # Wait for space rather than publishing out of order
+            while self._pending_count + len(self._fallback_queue) >= \
+                    self.max_pending:
+                remaining = queued + self.max_delay - time.monotonic()
+                if remaining <= 0:
+                    self.errors += 1
+                    LOG.error(f"Dropped message to {routing_key}: "
+                              f"{self.max_pending} messages pending")
+                    return
+                self._space_available.wait(remaining)
+            if not self._pending_count:
+                self._oldest = time.monotonic()
+            self._pending.setdefault(routing_key, []).append(
+                (time.monotonic(), body))
+            self._pending_count += 1
+            self._condition.notify()
+
+    def _next_batch(self) -> Optional[Dict[str, List[Tuple[float, bytes]]]]:
+        """
+        Wait for a batch to be ready to publish
+        :returns: pending messages by routing key, or None if idle
+        """
+        with self._condition:
+            if not self._pending_count and not self._stopping:
+                self._condition.wait(self.heartbeat_interval)
+            if not self._pending_count:
+                return None
+            deadline = self._oldest + self.window
+            while not self._stopping and \
+                    self._pending_count < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+            if self._pending_count <= self.max_batch_size:
+                batch = self._pending
+                self._pending = OrderedDict()
+                self._pending_count = 0
+                self._oldest = None
+                self._space_available.notify_all()
+                return batch
+            # Take the oldest messages for each routing key up to the limit
+            batch = OrderedDict()
+            remaining = self.max_batch_size
+            for routing_key in list(self._pending):
+                if not remaining:
+                    break
+                messages = self._pending[routing_key]
+                batch[routing_key] = messages[:remaining]
+                if len(messages) > remaining:
+                    self._pending[routing_key] = messages[remaining:]
+                else:
+                    self._pending.pop(routing_key)
+                remaining -= len(batch[routing_key])
+            self._pending_count -= self.max_batch_size
+            self._oldest = min(m[0][0] for m in self._pending.values())
+            self._space_available.notify_all()
+            return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if batch:
+                self._publish_batch(batch)
+            elif self._stopping:
+                break
+            elif self._connection and self._connection.is_open:
+                # Service heartbeats while idle
+                try:
+                    self._connection.process_data_events(0)
+                except Exception as e:
+                    LOG.warning(f"Publish connection error: {e}")
+                    self._close()
+        self._close()
+
+    def _get_channel(self):
+        if not (self._channel and self._channel.is_open):
+            self._close()
+            self._connection = self._connection_factory()
+            self._channel = self._connection.channel()
+            if self.confirm:
+                self._channel.tx_select()
+        return self._channel
+
+    def _close(self):
+        try:
+            if self._connection and self._connection.is_open:
+                self._connection.close()
+        except Exception as e:
+            LOG.error(f"Failed to close publish connection: {e}")
+        self._connection = None
+        self._channel = None
+        self._declared_queues.clear()
+
+    def _publish_batch(self, batch: Dict[str, List[Tuple[float, bytes]]],
+                       retry: bool = True):
+        now = time.monotonic()
+        expired = OrderedDict()
+        with self._condition:
+            for routing_key in list(batch):
+                # Messages are in the order they were queued, so if the
+                # oldest has expired or earlier messages are waiting for
+                # `fallback`, the rest must be passed to `fallback` too
+                if routing_key in self._fallback_keys or \
+                        now - batch[routing_key][0][0] >= self.max_delay:
+                    expired[routing_key] = batch.pop(routing_key)
+        if expired:
+            self._handle_unpublished(expired,
+                                     f"not published within {self.max_delay}s")
+        if not batch:
+            return
+        if not (self._channel and self._channel.is_open) and \
+                now < self._reconnect_at:
+            self._handle_unpublished(batch, "publish connection unavailable")
+            return
+
+        properties = pika.BasicProperties(expiration=self.expiration)
+        started_publishing = False
+        sent = dict()
+        try:
+            channel = self._get_channel()
+            for routing_key, messages in batch.items():
+                if routing_key not in self._declared_queues:
+                    channel.queue_declare(queue=routing_key, auto_delete=False)
+                    self._declared_queues.add(routing_key)
+                for _, body in messages:
+                    started_publishing = True
+                    channel.basic_publish(exchange='', routing_key=routing_key,
+                                          body=body, properties=properties)
+                    sent[routing_key] = sent.get(routing_key, 0) + 1
+            if self.confirm:
+                channel.tx_commit()
+        except Exception as e:
+            self._close()
+            # Without a transaction, some messages may have been published
+            if retry and (self.confirm or not started_publishing):
+                LOG.warning(f"Retrying batch publish after error: {e}")
+                return self._publish_batch(batch, retry=False)
+            self._reconnect_at = time.monotonic() + self.max_delay
+            if self.confirm:
+                unpublished = batch
+            else:
+                unpublished = OrderedDict(
+                    (routing_key, messages[sent.get(routing_key, 0):])
+                    for routing_key, messages in batch.items()
+                    if len(messages) > sent.get(routing_key, 0))
+                self._record_published(OrderedDict(
+                    (routing_key, batch[routing_key][:count])
+                    for routing_key, count in sent.items()))
+            self._handle_unpublished(unpublished, repr(e))
+            return
+        self._record_published(batch)
+
+    def _record_published(self, batch: Dict[str, List[Tuple[float, bytes]]]):
+        if not batch:
+            return
+        published = time.monotonic()
+        with self._condition:
+            self.batches += 1
+            for messages in batch.values():
+                for queued, _ in messages:
+                    wait = published - queued
+                    self.messages += 1
+                    self._total_wait += wait
+                    self.max_wait = max(self.max_wait, wait)
+
+    def _handle_unpublished(self,
+                            messages: Dict[str, List[Tuple[float, bytes]]],
+                            reason: str):
+        """
+        Queue messages the batcher could not publish for `fallback`
+        :param messages: unpublished messages by routing key
+        :param reason: description of why messages were not published
+        """
+        count = sum(len(m) for m in messages.values())
+        with self._condition:
+            if not self._fallback:
+                LOG.error(f"Failed to publish {count} messages: {reason}")
+                self.errors += count
+                return
+            LOG.warning(f"Publishing {count} messages individually: {reason}")
+            for routing_key, queued_messages in messages.items():
+                for _, body in queued_messages:
+                    self._fallback_queue.append((routing_key, body))
+                self._fallback_keys[routing_key] = \
+                    self._fallback_keys.get(routing_key, 0) + \
+                    len(queued_messages)
+            self._fallback_ready.notify()
+
+    def _run_fallback(self):
+        while True:
+            with self._condition:
+                while not self._fallback_queue and self.running:
+                    self._fallback_ready.wait(self.heartbeat_interval)
+                if not self._fallback_queue:
+                    break
+                routing_key, body = self._fallback_queue.popleft()
+            try:
+                self._fallback(b64_to_dict(body), routing_key)
+                success = True
+            except Exception as e:
+                LOG.error(f"Failed to publish to {routing_key}: {e}")
+                success = False
+            with self._condition:
+                if success:
+                    self.fallbacks += 1
+                else:
+                    self.errors += 1
+                # Only allow batching to this key after earlier messages
+                # have been published
+                self._fallback_keys[routing_key] -= 1
+                if not self._fallback_keys[routing_key]:
+                    self._fallback_keys.pop(routing_key)
+                self._space_available.notify_all()
+
+    def as_dict(self) -> dict:
+        with self._condition:
+            return {"batches": self.batches,
+                    "messages": self.messages,
+                    "errors": self.errors,
+                    "fallbacks": self.fallbacks,
+                    "pending": self._pending_count,
+                    "fallback_pending": len(self._fallback_queue),
+                    "mean_batch_size": round(self.messages / self.batches, 3)
+                    if self.batches else 0.0,
+                    "mean_wait": round(self._total_wait / self.messages, 6)
+                    if self.messages else 0.0,
+                    "max_wait": round(self.max_wait, 6)}
@@ -0,0 +1,145 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Framework
+# All trademark and other rights reserved by their respective owners
+# Copyright 2008-2025 Neongecko.com Inc.
+# Contributors: Daniel McKnight, Guy Daniels, Elon Gasper, Richard Leeds,
+# Regina Bloomstine, Casimiro Ferreira, Andrii Pernatii, Kirill Hrymailo
+# BSD-3 License
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from this
+#    software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS  BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS;  OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import time
+
+from collections import OrderedDict
+from threading import Lock
+from typing import Dict, Hashable, List, Tuple
+
+
+class CachedRequest:
+    """
+    Record of a handled request and the responses published for it
+    """
+
+    def __init__(self, key: Hashable):
+        self.key = key
+        self.created = time.time()
+        self.responses: List[dict] = list()
+        self.size = 0
+        # False if responses exceeded the cache size and were discarded
+        self.cacheable = True
+
+
+class RequestCache:
+    """
+    Bounded TTL cache of recently handled requests, used to recognize
+    retried and redelivered requests so they are not sent to core again.
+    Keys should include the routing key responses are sent to, so that a
+    request is only recognized as a duplicate of one from the same client.
+    Responses published for a cached request are
+    retained (up to `max_bytes` in total) so duplicates can be answered
+    without another round trip to core.
+    """
+
+    def __init__(self, ttl: float = 60, max_entries: int = 1000,
+                 max_bytes: int = 16 * 1024 * 1024):
+        """
+        :param ttl: seconds to remember a request
+        :param max_entries: max number of requests to remember
+        :param max_bytes: max total (serialized) size of cached responses
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._bytes = 0
+        self._entries: Dict[Hashable, CachedRequest] = OrderedDict()
+        self._lock = Lock()
+
+    def _evict(self, entry: CachedRequest):
+        self._entries.pop(entry.key, None)
+        self._bytes -= entry.size
+        self.evictions += 1
+
+    def _prune(self):
+        expiration = time.time() - self.ttl
+        while self._entries:
+            oldest = next(iter(self._entries.values()))
+            if oldest.created >= expiration and \
+                    len(self._entries) <= self.max_entries and \
+                    self._bytes <= self.max_bytes:
+                break
+            self._evict(oldest)
+
+    def check(self, key: Hashable) -> Tuple[bool, List[dict]]:
+        """
+        Check if a request is a duplicate. New requests are added to the
+        cache.
+        :param key: unique key of the request
+        :returns: True if the request is a duplicate, and a list of responses
+            already published for the original request
+        """
+        with self._lock:
+            self._prune()
+            entry = self._entries.get(key)
+            if not entry:
+                self.misses += 1
+                self._entries[key] = CachedRequest(key)
+                self._prune()
+                return False, []
+            self.hits += 1
+            return True, list(entry.responses) if entry.cacheable else []
+
+    def add_response(self, key: Hashable, response: dict, size: int):
+        """
+        Cache a response to a request
+        :param key: unique key of the request being responded to
+        :param response: serializable response data
+        :param size: size in bytes of the serialized response
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if not entry:
+                return
+            if entry.cacheable:
+                if entry.size + size > self.max_bytes:
+                    # Never cache a partial set of responses
+                    entry.cacheable = False
+                    self._bytes -= entry.size
+                    entry.size = 0
+                    entry.responses.clear()
+                else:
+                    entry.responses.append(response)
+                    entry.size += size
+                    self._bytes += size
+                    self._prune()
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {"entries": len(self._entries),
+                    "bytes": self._bytes,
+                    "hits": self.hits,
+                    "misses": self.misses,
+                    "evictions": self.evictions,
+                    "hit_rate": round(self.hits / lookups, 6)
+                    if lookups else 0.0}
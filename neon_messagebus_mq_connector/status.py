@@ -0,0 +1,102 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Framework
+# All trademark and other rights reserved by their respective owners
+# Copyright 2008-2025 Neongecko.com Inc.
+# Contributors: Daniel McKnight, Guy Daniels, Elon Gasper, Richard Leeds,
+# Regina Bloomstine, Casimiro Ferreira, Andrii Pernatii, Kirill Hrymailo
+# BSD-3 License
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from this
+#    software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS  BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS;  OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import json
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Thread
+from typing import Callable
+from ovos_utils.log import LOG
+
+
+class StatusServer:
+    """
+    Minimal HTTP server exposing connector status for orchestrators.
+    `GET /status` returns the full status; `GET /ready` returns only the
+    readiness. Both respond `503` when the connector is not ready.
+    """
+
+    def __init__(self, get_status: Callable[[], dict],
+                 host: str = "127.0.0.1", port: int = 8080):
+        """
+        :param get_status: method returning a status dict that includes a
+            boolean `ready` key
+        :param host: address to bind to
+        :param port: port to bind to (0 to choose any available port)
+        """
+        self._get_status = get_status
+        self._server = ThreadingHTTPServer((host, port),
+                                           self._get_handler_class())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def address(self) -> tuple:
+        return self._server.server_address
+
+    def _get_handler_class(self):
+        get_status = self._get_status
+
+        class _StatusRequestHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                path = self.path.split('?')[0].rstrip('/')
+                if path not in ("/status", "/ready"):
+                    self.send_error(404)
+                    return
+                try:
+                    status = get_status()
+                except Exception as e:
+                    LOG.exception(e)
+                    self.send_error(500, repr(e))
+                    return
+                if path == "/ready":
+                    status = {"ready": status.get("ready", False)}
+                body = json.dumps(status).encode("utf-8")
+                self.send_response(200 if status.get("ready") else 503)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                LOG.debug(f"{self.address_string()} - {format % args}")
+
+        return _StatusRequestHandler
+
+    def start(self):
+        self._thread = Thread(target=self._server.serve_forever, daemon=True,
+                              name="status_server")
+        self._thread.start()
+        LOG.info(f"Status server listening on {self.address}")
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread:
+            self._thread.join(timeout=3)
+            self._thread = None
@@ -0,0 +1,205 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Framework
+# All trademark and other rights reserved by their respective owners
+# Copyright 2008-2025 Neongecko.com Inc.
+# Contributors: Daniel McKnight, Guy Daniels, Elon Gasper, Richard Leeds,
+# Regina Bloomstine, Casimiro Ferreira, Andrii Pernatii, Kirill Hrymailo
+# BSD-3 License
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from this
+#    software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS  BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS;  OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+Benchmark response publishing throughput against the latency added by
+batching. Messages are published to several routing keys as fast as a single
+producer can, first with a new connection per message (the unbatched
+`MQConnector.send_message` behavior), then through `PublishBatcher` over a
+persistent channel with no window (one message per batch), then with each
+configured window. By default, the broker is simulated with a fixed delay per
+round trip; specify a broker to publish to it instead.
+
+Latency is measured the same way for every benchmark: the time from a
+message being handed to the publisher until it has been published (and
+committed, with `confirm`). Note that the unbatched producer is blocked while
+publishing, so its messages never wait behind each other.
+
+Usage: python tests/publish_benchmark.py [--messages N] [--rtt SECONDS]
+       [--mq-server HOST --mq-user USER --mq-password PASSWORD]
+"""
+
+import time
+
+from statistics import mean
+from typing import Callable, Dict, List, Optional
+
+import pika
+
+from neon_mq_connector.connector import MQConnector
+from neon_messagebus_mq_connector.publisher import PublishBatcher
+
+WINDOWS = (0.0005, 0.001, 0.002, 0.005)
+
+
+class SimulatedChannel:
+    """
+    Stand-in for `BlockingChannel` where each synchronous method takes one
+    network round trip
+    """
+
+    def __init__(self, rtt: float):
+        self.rtt = rtt
+        self.is_open = True
+
+    def _round_trip(self, *_, **__):
+        time.sleep(self.rtt)
+
+    queue_declare = tx_select = tx_commit = close = _round_trip
+
+    def basic_publish(self, *_, **__):
+        pass
+
+
+class SimulatedConnection(pika.BlockingConnection):
+    """
+    Stand-in for `BlockingConnection`; opening a connection takes three round
+    trips (TCP, AMQP start/tune, connection open) and closing takes one.
+    """
+    is_open = True
+
+    # Parent `__init__` is intentionally not called; no socket is opened
+    def __init__(self, rtt: float):  # noqa
+        self.rtt = rtt
+        time.sleep(3 * rtt)
+
+    def channel(self, *_, **__):
+        time.sleep(self.rtt)
+        return SimulatedChannel(self.rtt)
+
+    def process_data_events(self, *_, **__):
+        pass
+
+    def close(self):
+        time.sleep(self.rtt)
+        self.is_open = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+
+def _messages(count: int, keys: int) -> List[tuple]:
+    return [({"msg_type": "klat.response", "data": {"n": n},
+              "context": {"mq": {"routing_key": f"bench_{n % keys}"}}},
+             f"bench_{n % keys}") for n in range(count)]
+
+
+def benchmark_unbatched(connection_factory: Callable, count: int,
+                        keys: int) -> Dict[str, float]:
+    latencies = []
+    start = time.monotonic()
+    for data, routing_key in _messages(count, keys):
+        queued = time.monotonic()
+        with connection_factory() as connection:
+            MQConnector.emit_mq_message(connection, data, queue=routing_key)
+            latencies.append(time.monotonic() - queued)
+    elapsed = time.monotonic() - start
+    return {"throughput": count / elapsed,
+            "mean_latency": mean(latencies),
+            "max_latency": max(latencies)}
+
+
+def benchmark_batched(connection_factory: Callable, count: int, keys: int,
+                      window: float, confirm: bool,
+                      max_batch_size: int = 100) -> Dict[str, float]:
+    batcher = PublishBatcher(connection_factory, window=window,
+                             max_batch_size=max_batch_size, confirm=confirm)
+    batcher.start()
+    start = time.monotonic()
+    for data, routing_key in _messages(count, keys):
+        batcher.publish(data, routing_key)
+    while batcher.as_dict()["messages"] + batcher.errors < count:
+        time.sleep(0.0001)
+    elapsed = time.monotonic() - start
+    stats = batcher.as_dict()
+    batcher.stop()
+    return {"throughput": count / elapsed,
+            "mean_latency": stats["mean_wait"],
+            "max_latency": stats["max_wait"],
+            "mean_batch_size": stats["mean_batch_size"]}
+
+
+def run_benchmarks(count: int = 1000, keys: int = 10, rtt: float = 0.0005,
+                   mq_config: Optional[dict] = None) -> Dict[str, dict]:
+    """
+    Run each benchmark
+    :param count: number of messages to publish
+    :param keys: number of routing keys to publish to
+    :param rtt: simulated network round trip time in seconds
+    :param mq_config: optional dict of MQ `server`, `port`, `user` and
+        `password` to publish to instead of a simulated broker
+    :returns: dict of benchmark name to results
+    """
+    if mq_config:
+        params = pika.ConnectionParameters(
+            host=mq_config["server"], port=mq_config.get("port", 5672),
+            credentials=pika.PlainCredentials(mq_config["user"],
+                                              mq_config["password"]))
+
+        def connection_factory():
+            return pika.BlockingConnection(params)
+    else:
+        def connection_factory():
+            return SimulatedConnection(rtt)
+    results = {"unbatched": benchmark_unbatched(connection_factory,
+                                                # This is slow; use fewer
+                                                max(count // 10, 1), keys)}
+    for confirm in (False, True):
+        name = "persistent,window=0" + (",confirm" if confirm else "")
+        results[name] = benchmark_batched(connection_factory, count, keys,
+                                          0, confirm, max_batch_size=1)
+    for window in WINDOWS:
+        for confirm in (False, True):
+            name = f"window={window * 1000}ms" + \
+                   (",confirm" if confirm else "")
+            results[name] = benchmark_batched(connection_factory, count,
+                                              keys, window, confirm)
+    return results
+
+
+if __name__ == '__main__':
+    from argparse import ArgumentParser
+    parser = ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--messages", type=int, default=1000)
+    parser.add_argument("--keys", type=int, default=10)
+    parser.add_argument("--rtt", type=float, default=0.0005)
+    parser.add_argument("--mq-server")
+    parser.add_argument("--mq-port", type=int, default=5672)
+    parser.add_argument("--mq-user")
+    parser.add_argument("--mq-password")
+    args = parser.parse_args()
+    mq = {"server": args.mq_server, "port": args.mq_port,
+          "user": args.mq_user, "password": args.mq_password} \
+        if args.mq_server else None
+    for name, result in run_benchmarks(args.messages, args.keys, args.rtt,
+                                       mq).items():
+        print(f"{name:>28}: " + ", ".join(f"{k}={v:.6g}"
+                                          for k, v in result.items()))
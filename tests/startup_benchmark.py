@@ -0,0 +1,143 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Framework
+# All trademark and other rights reserved by their respective owners
+# Copyright 2008-2025 Neongecko.com Inc.
+# Contributors: Daniel McKnight, Guy Daniels, Elon Gasper, Richard Leeds,
+# Regina Bloomstine, Casimiro Ferreira, Andrii Pernatii, Kirill Hrymailo
+# BSD-3 License
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from this
+#    software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS  BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS;  OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+Benchmark the time from process start to the first handled MQ message.
+Each measurement runs in a new interpreter so that import time is included.
+By default, no MQ broker is used and the first message is passed directly to
+the request handler after the connector is initialized. If a broker is
+specified, consumers are started and the first message is published to and
+consumed from the shared request queue.
+
+Usage: python tests/startup_benchmark.py [--runs N]
+       [--mq-server HOST --mq-user USER --mq-password PASSWORD]
+"""
+
+import json
+import subprocess
+import sys
+
+from statistics import median
+from typing import Dict, List, Optional
+
+_CHILD = '''
+import json
+import sys
+import time
+start = time.perf_counter()
+import neon_messagebus_mq_connector
+from neon_messagebus_mq_connector import ChatAPIProxy
+imported = time.perf_counter()
+from threading import Event
+from unittest.mock import Mock
+from neon_mq_connector.utils.network_utils import dict_to_b64
+mq_config = json.loads(sys.argv[1])
+config = {"MQ": {"server": mq_config.get("server") or "localhost",
+                 "port": mq_config.get("port", 5672),
+                 "users": {"chat_api_proxy": {
+                     "user": mq_config.get("user") or "bench",
+                     "password": mq_config.get("password") or "bench"}}},
+          "websocket": {"host": "127.0.0.1", "port": 1}}
+request = {"msg_type": "recognizer_loop:utterance",
+           "data": {"utterances": ["hello"], "lang": "en-us"},
+           "context": {"mq": {"routing_key": "bench",
+                              "message_id": str(time.time())}}}
+handled = Event()
+
+
+class BenchmarkProxy(ChatAPIProxy):
+    def connect_bus(self, refresh=False):
+        super().connect_bus(refresh)
+        # Core is not running; record emitted messages
+        self._bus.emit = Mock()
+
+    def handle_user_message(self, *args, **kwargs):
+        super().handle_user_message(*args, **kwargs)
+        handled.set()
+
+
+proxy = BenchmarkProxy(config, "chat_api_proxy")
+initialized = time.perf_counter()
+if mq_config.get("server"):
+    proxy.run(run_sync=False, run_observer=False, daemonize_consumers=True)
+    proxy.send_message(request, queue="neon_chat_api_request",
+                       expiration=60000)
+    assert handled.wait(30), "Message not consumed"
+else:
+    proxy.handle_user_message(Mock(), Mock(), None, dict_to_b64(request))
+first_message = time.perf_counter()
+assert proxy.bus.emit.call_count == 1
+print(json.dumps({"import": imported - start,
+                  "init": initialized - start,
+                  "first_message": first_message - start}))
+proxy.bus.close()
+if mq_config.get("server"):
+    proxy.stop()
+'''
+
+
+def measure_startup(mq_config: Optional[dict] = None) -> Dict[str, float]:
+    """
+    Measure startup in a new interpreter
+    :param mq_config: optional dict of MQ `server`, `port`, `user` and
+        `password` to consume the first message from
+    :returns: dict of seconds from start until the package is imported
+        (`import`), `ChatAPIProxy` is initialized (`init`), and the first
+        message is handled (`first_message`)
+    """
+    result = subprocess.run([sys.executable, "-c", _CHILD,
+                             json.dumps(mq_config or {})],
+                            capture_output=True, text=True, check=True,
+                            timeout=120)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def benchmark(runs: int = 5,
+              mq_config: Optional[dict] = None) -> Dict[str, float]:
+    """
+    Get the median of `runs` startup measurements
+    """
+    results: List[Dict[str, float]] = [measure_startup(mq_config)
+                                       for _ in range(runs)]
+    return {key: median(r[key] for r in results) for key in results[0]}
+
+
+if __name__ == '__main__':
+    from argparse import ArgumentParser
+    parser = ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--mq-server")
+    parser.add_argument("--mq-port", type=int, default=5672)
+    parser.add_argument("--mq-user")
+    parser.add_argument("--mq-password")
+    args = parser.parse_args()
+    mq = {"server": args.mq_server, "port": args.mq_port,
+          "user": args.mq_user, "password": args.mq_password} \
+        if args.mq_server else None
+    for name, seconds in benchmark(args.runs, mq).items():
+        print(f"{name}: {seconds:.3f}s")
@@ -0,0 +1,149 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Framework
+# All trademark and other rights reserved by their respective owners
+# Copyright 2008-2025 Neongecko.com Inc.
+# Contributors: Daniel McKnight, Guy Daniels, Elon Gasper, Richard Leeds,
+# Regina Bloomstine, Casimiro Ferreira, Andrii Pernatii, Kirill Hrymailo
+# BSD-3 License
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from this
+#    software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS  BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS;  OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import unittest
+
+from base64 import b64encode, b64decode
+from time import sleep
+
+from neon_messagebus_mq_connector.audio_stream import AudioStreamReassembler
+
+
+class AudioStreamReassemblerTests(unittest.TestCase):
+    @staticmethod
+    def _chunk(stream_id, offset, chunk, final=False, **kwargs):
+        return {"msg_type": "neon.audio_input",
+                "data": {"audio_data": b64encode(chunk).decode(),
+                         "stream": {"stream_id": stream_id, "offset": offset,
+                                    "final": final, **kwargs}},
+                "context": {}}
+
+    def test_is_chunk(self):
+        self.assertTrue(AudioStreamReassembler.is_chunk(
+            self._chunk("test", 0, b"")))
+        self.assertFalse(AudioStreamReassembler.is_chunk(
+            {"msg_type": "neon.audio_input", "data": {"audio_data": ""}}))
+        self.assertFalse(AudioStreamReassembler.is_chunk(
+            {"msg_type": "recognizer_loop:utterance",
+             "data": {"stream": {}}}))
+        self.assertFalse(AudioStreamReassembler.is_chunk(
+            {"msg_type": "neon.audio_input", "data": None}))
+
+    def test_preallocated(self):
+        streams = AudioStreamReassembler()
+        self.assertIsNone(streams.add_chunk(
+            self._chunk("test", 4, b"5678", True, total_bytes=8)))
+        self.assertEqual(len(streams._streams["test"].buffer), 8)
+        # Duplicate chunks are not counted twice
+        self.assertIsNone(streams.add_chunk(
+            self._chunk("test", 4, b"5678", True, total_bytes=8)))
+        result = streams.add_chunk(self._chunk("test", 0, b"1234"))
+        self.assertEqual(b64decode(result["data"]["audio_data"]), b"12345678")
+        self.assertEqual(streams.active_streams, 0)
+
+        with self.assertRaises(ValueError):
+            streams.add_chunk(self._chunk("test", 4, b"56789",
+                                          total_bytes=8))
+        self.assertEqual(streams.active_streams, 0)
+
+    def test_overlapping_chunks(self):
+        streams = AudioStreamReassembler()
+        self.assertIsNone(streams.add_chunk(self._chunk("test", 0, b"1234")))
+        # Client re-sends overlapping audio with different chunk boundaries
+        self.assertIsNone(streams.add_chunk(self._chunk("test", 2, b"3456")))
+        self.assertEqual(streams._streams["test"].received_bytes, 6)
+        result = streams.add_chunk(self._chunk("test", 4, b"5678", True))
+        self.assertEqual(b64decode(result["data"]["audio_data"]), b"12345678")
+        self.assertEqual(streams.active_streams, 0)
+
+        # Final chunk completes the stream when received before a gap
+        self.assertIsNone(streams.add_chunk(self._chunk("gap", 6, b"78",
+                                                        True)))
+        self.assertIsNone(streams.add_chunk(self._chunk("gap", 0, b"1234")))
+        result = streams.add_chunk(self._chunk("gap", 3, b"456"))
+        self.assertEqual(b64decode(result["data"]["audio_data"]), b"12345678")
+
+        # Chunks past the end of the stream are rejected
+        streams.add_chunk(self._chunk("end", 2, b"34", True))
+        with self.assertRaises(ValueError):
+            streams.add_chunk(self._chunk("end", 2, b"345"))
+        self.assertEqual(streams.active_streams, 0)
+        streams.add_chunk(self._chunk("end", 2, b"3456"))
+        with self.assertRaises(ValueError):
+            streams.add_chunk(self._chunk("end", 2, b"34", True))
+        self.assertEqual(streams.active_streams, 0)
+
+    def test_limits(self):
+        streams = AudioStreamReassembler(timeout=0.1, max_bytes=8)
+        with self.assertRaises(ValueError):
+            streams.add_chunk(self._chunk("test", 0, b"", total_bytes=9))
+        with self.assertRaises(ValueError):
+            streams.add_chunk(self._chunk("test", 0, b"123456789"))
+        with self.assertRaises(ValueError):
+            streams.add_chunk(self._chunk("", 0, b"1234"))
+
+        streams.add_chunk(self._chunk("abandoned", 0, b"1234"))
+        self.assertEqual(streams.active_streams, 1)
+        sleep(0.2)
+        streams.prune()
+        self.assertEqual(streams.active_streams, 0)
+        self.assertEqual(streams.buffered_bytes, 0)
+
+    def test_total_limits(self):
+        streams = AudioStreamReassembler(max_bytes=8, max_streams=2,
+                                         max_total_bytes=12)
+        streams.add_chunk(self._chunk("1", 0, b"1", total_bytes=8))
+        self.assertEqual(streams.buffered_bytes, 8)
+        # Declared sizes count toward the total before anything is allocated
+        with self.assertRaises(ValueError):
+            streams.add_chunk(self._chunk("2", 0, b"1", total_bytes=8))
+        self.assertEqual(streams.active_streams, 1)
+        self.assertEqual(streams.buffered_bytes, 8)
+        streams.add_chunk(self._chunk("2", 0, b"1234"))
+        self.assertEqual(streams.buffered_bytes, 12)
+        with self.assertRaises(ValueError):
+            streams.add_chunk(self._chunk("2", 4, b"5"))
+        self.assertEqual(streams.active_streams, 1)
+        self.assertEqual(streams.buffered_bytes, 8)
+
+        # Number of active streams is limited
+        streams.add_chunk(self._chunk("3", 0, b"1"))
+        with self.assertRaises(ValueError):
+            streams.add_chunk(self._chunk("4", 0, b"1"))
+        self.assertEqual(streams.active_streams, 2)
+
+        # Completed streams free their buffers
+        result = streams.add_chunk(self._chunk("1", 1, b"2345678", True))
+        self.assertEqual(b64decode(result["data"]["audio_data"]), b"12345678")
+        self.assertEqual(streams.buffered_bytes, 1)
+        streams.add_chunk(self._chunk("4", 0, b"1"))
+        self.assertEqual(streams.active_streams, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
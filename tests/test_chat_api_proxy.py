@@ -0,0 +1,413 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Framework
+# All trademark and other rights reserved by their respective owners
+# Copyright 2008-2025 Neongecko.com Inc.
+# Contributors: Daniel McKnight, Guy Daniels, Elon Gasper, Richard Leeds,
+# Regina Bloomstine, Casimiro Ferreira, Andrii Pernatii, Kirill Hrymailo
+# BSD-3 License
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from this
+#    software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS  BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS;  OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import os
+import unittest
+
+from base64 import b64encode, b64decode
+from hashlib import sha256
+from time import sleep
+from unittest.mock import patch, Mock
+
+from neon_utils.socket_utils import dict_to_b64
+from ovos_bus_client.message import Message
+
+from neon_messagebus_mq_connector.controller import ChatAPIProxy
+from neon_messagebus_mq_connector.publisher import PublishBatcher
+
+
+def _get_proxy(**properties) -> ChatAPIProxy:
+    config = {"MQ": {"server": "localhost",
+                     "users": {"chat_api_proxy": {
+                         "user": "test", "password": "test",
+                         "properties": properties}}},
+              "websocket": {"host": "localhost"}}
+    with patch.object(ChatAPIProxy, "connect_bus"):
+        return ChatAPIProxy(config, "chat_api_proxy")
+
+
+@patch.object(ChatAPIProxy, "async_consumers_enabled", False)
+class ChatAPIProxyTests(unittest.TestCase):
+    def test_default_consumers(self):
+        proxy = _get_proxy()
+        self.assertEqual(set(proxy.consumers),
+                         {f"neon_api_request_{proxy.service_id}",
+                          "neon_request_consumer"})
+        self.assertEqual(set(proxy.consumer_metrics), set(proxy.consumers))
+
+    def test_configured_consumers(self):
+        proxy = _get_proxy(consumer_count=3,
+                           additional_queues=[
+                               {"queue": "extra", "vhost": "/other",
+                                "consumer_count": 2},
+                               {"vhost": "/invalid"}])
+        self.assertEqual(len(proxy.consumers), 8)
+        shared = [c for c in proxy.consumers.values()
+                  if c.queue == "neon_chat_api_request"]
+        self.assertEqual(len(shared), 3)
+        extra = [m for m in proxy.get_consumer_metrics()
+                 if m["queue"] == "extra"]
+        self.assertEqual(len(extra), 2)
+        self.assertTrue(all(m["vhost"] == "/other" for m in extra))
+
+    def test_handle_streamed_audio(self):
+        proxy = _get_proxy()
+        proxy._bus = Mock()
+        proxy.send_message = Mock()
+        audio = bytes(range(256)) * 4
+        chunks = [(0, audio[:400]), (800, audio[800:]), (400, audio[400:800])]
+        channel = Mock()
+
+        def _request(offset, chunk):
+            return {"msg_type": "neon.get_stt",
+                    "data": {"audio_data": b64encode(chunk).decode(),
+                             "lang": "en-us",
+                             "stream": {"stream_id": "test",
+                                        "offset": offset,
+                                        "final": offset == 800}},
+                    "context": {"mq": {"routing_key": "test_response",
+                                       "message_id": "test_id"}}}
+
+        # Later chunks are rejected from the shared queue
+        proxy.handle_user_message(
+            channel, Mock(delivery_tag=0, routing_key="neon_chat_api_request"),
+            None, dict_to_b64(_request(*chunks[1])))
+        response = proxy.send_message.call_args.kwargs
+        self.assertEqual(response["request_data"]["msg_type"], "klat.error")
+        self.assertEqual(proxy.audio_streams.active_streams, 0)
+        proxy.send_message.reset_mock()
+
+        for idx, (offset, chunk) in enumerate(chunks):
+            # The first chunk is sent to the shared queue
+            queue = proxy.service_queue if idx else "neon_chat_api_request"
+            proxy.handle_user_message(
+                channel, Mock(delivery_tag=idx, routing_key=queue), None,
+                dict_to_b64(_request(offset, chunk)))
+            if idx == 0:
+                # Client is told where to send the rest of the stream
+                proxy.send_message.assert_called_once()
+                response = proxy.send_message.call_args.kwargs
+                self.assertEqual(response["queue"], "test_response")
+                self.assertEqual(response["request_data"]["msg_type"],
+                                 "neon.audio_stream.queue")
+                self.assertEqual(response["request_data"]["data"],
+                                 {"stream_id": "test",
+                                  "queue": proxy.service_queue})
+            if idx < len(chunks) - 1:
+                proxy._bus.emit.assert_not_called()
+        proxy.send_message.assert_called_once()
+        self.assertEqual(channel.basic_ack.call_count, len(chunks) + 1)
+        proxy._bus.emit.assert_called_once()
+        message = proxy._bus.emit.call_args[0][0]
+        self.assertEqual(message.msg_type, "neon.get_stt")
+        self.assertEqual(b64decode(message.data["audio_data"]), audio)
+        self.assertNotIn("stream", message.data)
+        self.assertEqual(proxy.audio_streams.active_streams, 0)
+
+    @patch("neon_messagebus_mq_connector.controller.pika.BlockingConnection")
+    def test_get_status(self, connection):
+        channel = connection.return_value.__enter__.return_value.channel()
+        channel.queue_declare.return_value = Mock(
+            method=Mock(message_count=50, consumer_count=2))
+        proxy = _get_proxy(status_cache_time=60, saturation_queue_depth=50)
+        proxy._bus = Mock()
+        proxy._bus.connected_event.is_set.return_value = True
+
+        status = proxy.get_status()
+        self.assertFalse(status["ready"])
+        self.assertTrue(status["bus_connected"])
+        self.assertEqual(set(status["consumers"]), set(proxy.consumers))
+        self.assertEqual(len(status["queues"]), 2)
+        self.assertEqual(status["queues"]["/neon_chat_api:neon_chat_api_request"],
+                         {"messages": 50, "consumers": 2})
+        self.assertEqual(status["ident_waits"], 0)
+        # Two queues with 50 messages each
+        self.assertEqual(status["saturation"], 2.0)
+        self.assertEqual(channel.queue_declare.call_count, 2)
+
+        # Queue depths are cached
+        proxy.get_status()
+        self.assertEqual(channel.queue_declare.call_count, 2)
+
+    def test_admin_consumer(self):
+        proxy = _get_proxy()
+        self.assertNotIn("neon_admin_consumer", proxy.consumers)
+        # An explicit admin vhost is required
+        proxy = _get_proxy(admin_queue="connector_admin")
+        self.assertNotIn("neon_admin_consumer", proxy.consumers)
+        # The admin vhost may not be a request vhost
+        proxy = _get_proxy(admin_queue="connector_admin",
+                           admin_vhost="/neon_chat_api")
+        self.assertNotIn("neon_admin_consumer", proxy.consumers)
+        proxy = _get_proxy(admin_queue="connector_admin",
+                           admin_vhost="/neon_admin",
+                           additional_queues=[{"vhost": "/neon_admin",
+                                               "queue": "requests"}])
+        self.assertNotIn("neon_admin_consumer", proxy.consumers)
+        proxy = _get_proxy(admin_queue="connector_admin",
+                           admin_vhost="/neon_admin")
+        self.assertEqual(proxy.consumers["neon_admin_consumer"].queue,
+                         "connector_admin")
+        properties = proxy.consumer_properties["neon_admin_consumer"]
+        self.assertEqual(properties["properties"]["connection_params"]
+                         .virtual_host, "/neon_admin")
+
+    def test_handle_admin_message(self):
+        proxy = _get_proxy(admin_queue="connector_admin",
+                           admin_vhost="/neon_admin", profile_dir="/tmp")
+        proxy.send_message = Mock()
+        channel = Mock()
+        request = {"msg_type": "neon.mq_connector.profile",
+                   "data": {"duration": 0.2, "interval": 0.01},
+                   "context": {}}
+        proxy.handle_admin_message(channel, Mock(delivery_tag=1), None,
+                                   dict_to_b64(request))
+        channel.basic_ack.assert_called_once_with(1)
+        self.assertTrue(proxy._profiler.running)
+
+        # Concurrent requests are rejected
+        proxy.handle_admin_message(channel, Mock(delivery_tag=2), None,
+                                   dict_to_b64(request))
+        proxy.send_message.assert_called_once()
+        self.assertIn("error",
+                      proxy.send_message.call_args.kwargs["request_data"]
+                      ["data"])
+
+        proxy._profiler.join()
+        sleep(0.2)
+        self.assertEqual(proxy.send_message.call_count, 2)
+        kwargs = proxy.send_message.call_args.kwargs
+        self.assertEqual(kwargs["queue"], "connector_admin_response")
+        self.assertEqual(kwargs["request_data"]["msg_type"],
+                         "neon.mq_connector.profile.response")
+        data = kwargs["request_data"]["data"]
+        self.assertTrue(data["path"].startswith("/tmp/"))
+        self.assertGreater(data["samples"], 0)
+        self.assertEqual(set(data["summary"]), {"self", "total"})
+        os.remove(data["path"])
+
+        # Invalid parameters are rejected
+        for params in ({"interval": "fast"}, {"interval": 0},
+                       {"duration": -1}, {"duration": None}):
+            proxy.send_message.reset_mock()
+            request["data"] = params
+            proxy.handle_admin_message(channel, Mock(delivery_tag=3), None,
+                                       dict_to_b64(request))
+            proxy.send_message.assert_called_once()
+            self.assertIn("error", proxy.send_message.call_args.kwargs
+                          ["request_data"]["data"], params)
+            self.assertFalse(proxy._profiler.running)
+
+    def test_handle_duplicate_request(self):
+        proxy = _get_proxy()
+        proxy._bus = Mock()
+        proxy.send_message = Mock()
+        request = {"msg_type": "recognizer_loop:utterance",
+                   "data": {"utterances": ["hello"], "lang": "en-us"},
+                   "context": {"mq": {"routing_key": "client_1",
+                                      "message_id": "request_1"}}}
+        proxy.handle_user_message(Mock(), Mock(), None, dict_to_b64(request))
+        proxy._bus.emit.assert_called_once()
+        emitted = proxy._bus.emit.call_args[0][0]
+
+        # In-flight duplicate is not sent to core again
+        proxy.handle_user_message(Mock(), Mock(), None, dict_to_b64(request))
+        proxy._bus.emit.assert_called_once()
+        proxy.send_message.assert_not_called()
+
+        response = Message("klat.response",
+                           {"responses": {"en-us": {"sentence": "hi"}}},
+                           emitted.context)
+        proxy.handle_neon_message(response)
+        proxy.send_message.assert_called_once()
+        self.assertEqual(proxy.send_message.call_args.kwargs["queue"],
+                         "client_1")
+        proxy.send_message.reset_mock()
+
+        # Completed duplicate is answered from the cache
+        proxy.handle_user_message(Mock(), Mock(), None, dict_to_b64(request))
+        proxy._bus.emit.assert_called_once()
+        proxy.send_message.assert_called_once()
+        self.assertEqual(proxy.send_message.call_args.kwargs["queue"],
+                         "client_1")
+        self.assertEqual(proxy.request_cache.as_dict()["hits"], 2)
+        proxy.send_message.reset_mock()
+
+        # The same ID from another client is a new request and never
+        # receives responses to the original request
+        request["context"]["mq"]["routing_key"] = "client_2"
+        proxy.handle_user_message(Mock(), Mock(), None, dict_to_b64(request))
+        self.assertEqual(proxy._bus.emit.call_count, 2)
+        proxy.send_message.assert_not_called()
+        response = Message("klat.response",
+                           {"responses": {"en-us": {"sentence": "hi"}}},
+                           proxy._bus.emit.call_args[0][0].context)
+        proxy.handle_neon_message(response)
+        proxy.send_message.assert_called_once()
+        self.assertEqual(proxy.send_message.call_args.kwargs["queue"],
+                         "client_2")
+
+    def test_null_request_data(self):
+        proxy = _get_proxy()
+        proxy._bus = Mock()
+        proxy.send_message = Mock()
+        request = {"msg_type": "neon.audio_input", "data": None,
+                   "context": {"mq": {"routing_key": "client_1"}}}
+        proxy.handle_user_message(Mock(), Mock(), None, dict_to_b64(request))
+        proxy._bus.emit.assert_not_called()
+        proxy.send_message.assert_called_once()
+        self.assertEqual(proxy.send_message.call_args.kwargs["queue"],
+                         "client_1")
+        self.assertEqual(proxy.send_message.call_args.kwargs["request_data"]
+                         ["msg_type"], "klat.error")
+
+    def test_top_level_message_id(self):
+        proxy = _get_proxy()
+        proxy._bus = Mock()
+        request = {"msg_type": "recognizer_loop:utterance",
+                   "message_id": "request_1",
+                   "data": {"utterances": ["hello"], "lang": "en-us"},
+                   "context": {"mq": {"routing_key": "client_1"}}}
+        proxy.handle_user_message(Mock(), Mock(), None, dict_to_b64(request))
+        proxy.handle_user_message(Mock(), Mock(), None, dict_to_b64(request))
+        proxy._bus.emit.assert_called_once()
+        self.assertEqual(
+            proxy._bus.emit.call_args[0][0].context["mq"]["message_id"],
+            "request_1")
+        stats = proxy.request_cache.as_dict()
+        self.assertEqual(stats["entries"], 1)
+        self.assertEqual(stats["hits"], 1)
+
+    def test_cached_response_size(self):
+        request = {"msg_type": "recognizer_loop:utterance",
+                   "data": {"utterances": ["hello"], "lang": "en-us"},
+                   "context": {"mq": {"routing_key": "client_1",
+                                      "message_id": "request_1"}}}
+        for policy in ("respond", "drop"):
+            proxy = _get_proxy(duplicate_request_policy=policy)
+            proxy._bus = Mock()
+            proxy.send_message = Mock()
+            proxy.handle_user_message(Mock(), Mock(), None,
+                                      dict_to_b64(request))
+            response = Message("klat.response",
+                               {"responses": {"en-us": {"sentence": "hi"}}},
+                               proxy._bus.emit.call_args[0][0].context)
+            proxy.handle_neon_message(response)
+            response_data = \
+                proxy.send_message.call_args.kwargs["request_data"]
+            # Responses are only cached when they may be sent again
+            self.assertEqual(proxy.request_cache.as_dict()["bytes"],
+                             len(PublishBatcher.serialize(response_data))
+                             if policy == "respond" else 0)
+
+    def test_invalid_duplicate_request_policy(self):
+        proxy = _get_proxy(duplicate_request_policy="ignore")
+        self.assertEqual(proxy.duplicate_request_policy, "respond")
+        proxy = _get_proxy(duplicate_request_policy="drop")
+        self.assertEqual(proxy.duplicate_request_policy, "drop")
+
+    def test_request_key_from_body(self):
+        request = {"msg_type": "recognizer_loop:utterance",
+                   "data": {"utterances": ["hello"], "lang": "en-us"},
+                   "context": {"mq": {"routing_key": "client_1"}}}
+        body = dict_to_b64(request)
+
+        # Requests without a `message_id` are not deduplicated by default
+        proxy = _get_proxy()
+        proxy._bus = Mock()
+        proxy.handle_user_message(Mock(), Mock(), None, body)
+        proxy.handle_user_message(Mock(), Mock(), None, body)
+        self.assertEqual(proxy._bus.emit.call_count, 2)
+        self.assertEqual(proxy.request_cache.as_dict()["entries"], 0)
+
+        proxy = _get_proxy(duplicate_request_policy="drop",
+                           request_cache_hash_requests=True)
+        proxy._bus = Mock()
+        proxy.send_message = Mock()
+        proxy.handle_user_message(Mock(), Mock(), None, body)
+        proxy.handle_user_message(Mock(), Mock(), None, body)
+        proxy._bus.emit.assert_called_once()
+        self.assertEqual(
+            proxy._bus.emit.call_args[0][0].context["mq"]["message_id"],
+            sha256(body).hexdigest())
+        request["data"]["utterances"] = ["goodbye"]
+        proxy.handle_user_message(Mock(), Mock(), None, dict_to_b64(request))
+        self.assertEqual(proxy._bus.emit.call_count, 2)
+        proxy.send_message.assert_not_called()
+
+    def test_request_cache_disabled(self):
+        proxy = _get_proxy(request_cache_entries=0)
+        self.assertIsNone(proxy.request_cache)
+        proxy._bus = Mock()
+        request = {"msg_type": "recognizer_loop:utterance",
+                   "data": {"utterances": ["hello"], "lang": "en-us"},
+                   "context": {"mq": {"routing_key": "client_1",
+                                      "message_id": "request_1"}}}
+        proxy.handle_user_message(Mock(), Mock(), None, dict_to_b64(request))
+        proxy.handle_user_message(Mock(), Mock(), None, dict_to_b64(request))
+        self.assertEqual(proxy._bus.emit.call_count, 2)
+
+    def test_publish_batcher(self):
+        proxy = _get_proxy()
+        self.assertIsNone(proxy.publish_batcher)
+        proxy.send_message = Mock()
+        proxy.publish_response({"test": True}, "client")
+        proxy.send_message.assert_called_once_with(
+            request_data={"test": True}, queue="client")
+
+        proxy = _get_proxy(publish_batch_window=0.01, publish_batch_size=10)
+        self.assertTrue(proxy.publish_batcher.running)
+        self.assertEqual(proxy.publish_batcher.window, 0.01)
+        self.assertEqual(proxy.publish_batcher.max_batch_size, 10)
+        self.assertEqual(proxy.publish_batcher.max_pending, 10000)
+        self.assertEqual(proxy.publish_batcher.max_delay, 1.0)
+        proxy.send_message = Mock()
+
+        # Messages the batcher can't publish are sent individually with a
+        # single connection attempt
+        proxy.emit_mq_message = Mock()
+        with patch("pika.BlockingConnection") as connection:
+            proxy.publish_batcher._fallback({"test": True}, "client")
+        params = connection.call_args[0][0]
+        self.assertEqual(params.connection_attempts, 1)
+        self.assertEqual(params.socket_timeout, 1.0)
+        proxy.emit_mq_message.assert_called_once_with(
+            connection.return_value.__enter__.return_value,
+            request_data={"test": True}, queue="client")
+        proxy.send_message.assert_not_called()
+        proxy.publish_batcher.publish = Mock()
+        proxy.publish_response({"test": True}, "client")
+        proxy.send_message.assert_not_called()
+        proxy.publish_batcher.publish.assert_called_once_with(
+            {"test": True}, "client", None)
+        proxy.publish_batcher.stop()
+        self.assertFalse(proxy.publish_batcher.running)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Framework
+# All trademark and other rights reserved by their respective owners
+# Copyright 2008-2025 Neongecko.com Inc.
+# Contributors: Daniel McKnight, Guy Daniels, Elon Gasper, Richard Leeds,
+# Regina Bloomstine, Casimiro Ferreira, Andrii Pernatii, Kirill Hrymailo
+# BSD-3 License
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from this
+#    software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS  BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS;  OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import unittest
+
+from time import sleep
+from unittest.mock import Mock
+
+from neon_messagebus_mq_connector.metrics import ConsumerMetrics, LagMetrics, \
+    get_saturation_score
+
+
+class ConsumerMetricsTests(unittest.TestCase):
+    def test_wrap(self):
+        metrics = ConsumerMetrics("test", "queue", "/vhost")
+        callback = Mock(side_effect=lambda *_: sleep(0.05))
+        wrapped = metrics.wrap(callback)
+        wrapped(1, 2, 3, 4)
+        callback.assert_called_once_with(1, 2, 3, 4)
+        stats = metrics.as_dict()
+        self.assertEqual(stats["messages_handled"], 1)
+        self.assertEqual(stats["errors"], 0)
+        self.assertGreaterEqual(stats["busy_time"], 0.05)
+        self.assertGreater(stats["utilization"], 0.0)
+        self.assertLessEqual(stats["utilization"], 1.0)
+
+        callback.side_effect = ValueError()
+        with self.assertRaises(ValueError):
+            wrapped(1, 2, 3, 4)
+        stats = metrics.as_dict()
+        self.assertEqual(stats["messages_handled"], 2)
+        self.assertEqual(stats["errors"], 1)
+
+    def test_recent_utilization(self):
+        metrics = ConsumerMetrics("test", "queue", "/vhost", window=0.1)
+        metrics.record(0.05)
+        self.assertGreater(metrics.recent_utilization, 0.0)
+        sleep(0.25)
+        self.assertEqual(metrics.recent_utilization, 0.0)
+        self.assertGreater(metrics.utilization, 0.0)
+
+    def test_lag_metrics(self):
+        lag = LagMetrics(smoothing=0.5)
+        self.assertIsNone(lag.as_dict()["average"])
+        self.assertEqual(lag.recent, 0.0)
+        lag.record(1.0)
+        lag.record(3.0)
+        self.assertEqual(lag.as_dict(), {"samples": 2, "last": 3.0,
+                                         "average": 2.0, "recent": 2.0,
+                                         "max": 3.0})
+
+    def test_stale_lag_metrics(self):
+        lag = LagMetrics(smoothing=0.5, window=0.1)
+        lag.record(10.0)
+        self.assertEqual(lag.recent, 10.0)
+        self.assertEqual(get_saturation_score(0.0, 0, lag.recent, 100, 5),
+                         2.0)
+
+        # Stale lag no longer counts toward saturation
+        sleep(0.15)
+        self.assertEqual(lag.recent, 0.0)
+        self.assertEqual(get_saturation_score(0.0, 0, lag.recent, 100, 5),
+                         0.0)
+        self.assertEqual(lag.as_dict()["average"], 10.0)
+
+        # New samples are not blended with the stale average
+        lag.record(1.0)
+        self.assertEqual(lag.recent, 1.0)
+
+    def test_saturation_score(self):
+        self.assertEqual(get_saturation_score(0.5, 0, 0.0, 100, 5), 0.5)
+        self.assertEqual(get_saturation_score(0.5, 200, 0.0, 100, 5), 2.0)
+        self.assertEqual(get_saturation_score(0.1, 10, 2.5, 100, 5), 0.5)
+        self.assertEqual(get_saturation_score(0.1, 10, 2.5, 0, 0), 0.1)
+
+
+if __name__ == '__main__':
+    unittest.main()
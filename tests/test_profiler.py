@@ -0,0 +1,94 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Framework
+# All trademark and other rights reserved by their respective owners
+# Copyright 2008-2025 Neongecko.com Inc.
+# Contributors: Daniel McKnight, Guy Daniels, Elon Gasper, Richard Leeds,
+# Regina Bloomstine, Casimiro Ferreira, Andrii Pernatii, Kirill Hrymailo
+# BSD-3 License
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from this
+#    software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS  BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS;  OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import os
+import threading
+import unittest
+
+from tempfile import gettempdir
+from threading import Thread
+from time import time
+
+from neon_messagebus_mq_connector.profiler import SamplingProfiler, \
+    MIN_SAMPLE_INTERVAL
+
+
+class SamplingProfilerTests(unittest.TestCase):
+    def test_profile(self):
+        def _busy():
+            end = time() + 0.3
+            while time() < end:
+                pass
+
+        thread = Thread(target=_busy, name="busy_thread")
+        thread.start()
+        profiler = SamplingProfiler(interval=0.01)
+        profiler.profile(0.2)
+        thread.join()
+        self.assertGreater(profiler.samples, 5)
+        self.assertTrue(any(stack.startswith("busy_thread;") and
+                            stack.endswith(f"_busy (test_profiler.py:"
+                                           f"{_busy.__code__.co_firstlineno})")
+                            for stack in profiler.stacks))
+        self.assertEqual(profiler.truncated, 0)
+        summary = profiler.summary(limit=3)
+        self.assertLessEqual(len(summary["self"]), 3)
+        self.assertTrue(summary["total"][0]["samples"] >=
+                        summary["self"][0]["samples"])
+
+        path = profiler.write_collapsed(
+            os.path.join(gettempdir(), "test.collapsed"))
+        with open(path) as f:
+            lines = f.read().splitlines()
+        os.remove(path)
+        self.assertEqual(len(lines), len(profiler.stacks))
+        self.assertEqual(sum(int(line.rsplit(' ', 1)[1]) for line in lines),
+                         sum(profiler.stacks.values()))
+
+    def test_limits(self):
+        self.assertEqual(SamplingProfiler(interval=0).interval,
+                         MIN_SAMPLE_INTERVAL)
+        stop = threading.Event()
+        threads = [Thread(target=stop.wait, name=f"waiting_{i}")
+                   for i in range(3)]
+        for thread in threads:
+            thread.start()
+        profiler = SamplingProfiler(max_stacks=1)
+        profiler.sample()
+        profiler.sample()
+        stop.set()
+        self.assertEqual(profiler.samples, 2)
+        self.assertGreater(profiler.truncated, 0)
+        self.assertLessEqual(len(profiler.stacks),
+                             1 + len(threading.enumerate()))
+        self.assertTrue(any(stack.endswith(";[truncated]")
+                            for stack in profiler.stacks))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,230 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Framework
+# All trademark and other rights reserved by their respective owners
+# Copyright 2008-2025 Neongecko.com Inc.
+# Contributors: Daniel McKnight, Guy Daniels, Elon Gasper, Richard Leeds,
+# Regina Bloomstine, Casimiro Ferreira, Andrii Pernatii, Kirill Hrymailo
+# BSD-3 License
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from this
+#    software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS  BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS;  OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import threading
+import unittest
+
+from time import sleep
+from unittest.mock import Mock, MagicMock
+
+from neon_mq_connector.utils.network_utils import b64_to_dict
+
+from neon_messagebus_mq_connector.publisher import PublishBatcher
+
+
+class PublishBatcherTests(unittest.TestCase):
+    @staticmethod
+    def _get_batcher(**kwargs):
+        connection = MagicMock()
+        channel = connection.channel.return_value
+        channel.is_open = True
+        batcher = PublishBatcher(lambda: connection, **kwargs)
+        return batcher, connection, channel
+
+    @staticmethod
+    def _published(channel):
+        return [(c.kwargs["routing_key"],
+                 b64_to_dict(c.kwargs["body"])["n"])
+                for c in channel.basic_publish.call_args_list]
+
+    def test_batch_window(self):
+        batcher, connection, channel = self._get_batcher(window=0.05)
+        batcher.start()
+        for n in range(5):
+            batcher.publish({"n": n}, "a" if n % 2 else "b")
+        sleep(0.02)
+        channel.basic_publish.assert_not_called()
+        sleep(0.1)
+        self.assertEqual(self._published(channel),
+                         [("b", 0), ("b", 2), ("b", 4), ("a", 1), ("a", 3)])
+        self.assertEqual(connection.channel.call_count, 1)
+        self.assertEqual(channel.queue_declare.call_count, 2)
+        channel.tx_commit.assert_not_called()
+        stats = batcher.as_dict()
+        self.assertEqual(stats["batches"], 1)
+        self.assertEqual(stats["messages"], 5)
+        self.assertLess(stats["max_wait"], 0.1)
+
+        # Queues are only declared once per channel
+        batcher.publish({"n": 5}, "a")
+        batcher.stop()
+        self.assertEqual(self._published(channel)[-1], ("a", 5))
+        self.assertEqual(channel.queue_declare.call_count, 2)
+        self.assertFalse(batcher.running)
+
+    def test_batch_size(self):
+        batcher, _, channel = self._get_batcher(window=0.05,
+                                                max_batch_size=3,
+                                                confirm=True)
+        self.assertLessEqual(PublishBatcher(Mock(), window=1).window, 0.05)
+        batcher.start()
+        for n in range(3):
+            batcher.publish({"n": n}, "a")
+        sleep(0.02)
+        self.assertEqual(self._published(channel), [("a", 0), ("a", 1),
+                                                    ("a", 2)])
+        channel.tx_select.assert_called_once()
+        channel.tx_commit.assert_called_once()
+        batcher.stop()
+
+        # Pending messages exceeding the limit are split into batches
+        batcher, _, channel = self._get_batcher(window=0.01,
+                                                max_batch_size=3)
+        for n in range(5):
+            batcher.publish({"n": n}, "a" if n < 2 else "b")
+        batcher.start()
+        sleep(0.05)
+        self.assertEqual(self._published(channel),
+                         [("a", 0), ("a", 1), ("b", 2), ("b", 3), ("b", 4)])
+        self.assertEqual(batcher.as_dict()["batches"], 2)
+        batcher.stop()
+
+    def test_benchmark(self):
+        from publish_benchmark import run_benchmarks
+        # Timing varies by machine; only check that every benchmark ran and
+        # reports comparable statistics
+        results = run_benchmarks(count=20, keys=4, rtt=0)
+        self.assertEqual(len(results), 11)
+        for name, result in results.items():
+            self.assertGreater(result["throughput"], 0, name)
+            self.assertLessEqual(result["mean_latency"],
+                                 result["max_latency"], name)
+        self.assertEqual(
+            results["persistent,window=0"]["mean_batch_size"], 1)
+
+    def test_publish_error(self):
+        batcher, connection, channel = self._get_batcher(window=0.01,
+                                                         confirm=True)
+        channel.tx_commit.side_effect = [Exception("closed"), None]
+        batcher.start()
+        batcher.publish({"n": 0}, "a")
+        sleep(0.1)
+        self.assertEqual(connection.channel.call_count, 2)
+        self.assertEqual(self._published(channel), [("a", 0), ("a", 0)])
+        self.assertEqual(batcher.as_dict()["errors"], 0)
+        self.assertEqual(batcher.as_dict()["messages"], 1)
+
+        # Without transactions, a partially published batch is not retried
+        batcher.confirm = False
+        channel.basic_publish.side_effect = Exception("closed")
+        batcher.publish({"n": 1}, "a")
+        sleep(0.1)
+        self.assertEqual(batcher.as_dict()["errors"], 1)
+        self.assertEqual(channel.basic_publish.call_count, 3)
+        batcher.stop()
+
+    def test_connection_fallback(self):
+        factory = Mock(side_effect=ConnectionError("down"))
+        fallback = Mock()
+        batcher = PublishBatcher(factory, window=0.01, max_delay=0.5,
+                                 fallback=fallback)
+        batcher.start()
+        batcher.publish({"n": 0}, "a")
+        sleep(0.05)
+        self.assertEqual(factory.call_count, 2)
+        fallback.assert_called_once()
+        self.assertEqual(fallback.call_args[0][0]["n"], 0)
+        self.assertEqual(fallback.call_args[0][1], "a")
+
+        # No connection is attempted until `max_delay` has passed
+        batcher.publish({"n": 1}, "b")
+        sleep(0.05)
+        self.assertEqual(factory.call_count, 2)
+        self.assertEqual(fallback.call_count, 2)
+        stats = batcher.as_dict()
+        self.assertEqual(stats["fallbacks"], 2)
+        self.assertEqual(stats["errors"], 0)
+        self.assertEqual(stats["messages"], 0)
+        batcher.stop()
+        self.assertFalse(batcher._fallback_thread)
+
+    def test_max_delay(self):
+        published = list()
+        fallback_done = threading.Event()
+
+        def _fallback(request_data, routing_key):
+            fallback_done.wait(1)
+            published.append((routing_key, request_data["n"]))
+
+        batcher, _, channel = self._get_batcher(window=0.01, max_delay=0.05,
+                                                fallback=_fallback)
+        channel.basic_publish.side_effect = \
+            lambda routing_key, body, **_: published.append(
+                (routing_key, b64_to_dict(body)["n"]))
+        batcher.publish({"n": 0}, "a")
+        sleep(0.06)
+        batcher.publish({"n": 1}, "a")
+        batcher.publish({"n": 2}, "b")
+        batcher.start()
+        sleep(0.05)
+        # The expired message and later messages to its routing key are
+        # published individually, in order
+        self.assertEqual(published, [("b", 2)])
+        batcher.publish({"n": 3}, "a")
+        sleep(0.05)
+        self.assertEqual(published, [("b", 2)])
+        self.assertEqual(batcher.as_dict()["fallback_pending"], 2)
+        fallback_done.set()
+        sleep(0.05)
+        self.assertEqual(published, [("b", 2), ("a", 0), ("a", 1), ("a", 3)])
+
+        # Once caught up, the routing key is batched again
+        batcher.publish({"n": 4}, "a")
+        sleep(0.05)
+        self.assertEqual(published[-1], ("a", 4))
+        self.assertEqual(batcher.as_dict()["fallbacks"], 3)
+        self.assertEqual(batcher.as_dict()["messages"], 2)
+        batcher.stop()
+
+    def test_max_pending(self):
+        fallback = Mock()
+        batcher, _, channel = self._get_batcher(max_batch_size=2,
+                                                max_pending=2,
+                                                max_delay=0.05,
+                                                fallback=fallback)
+        for n in range(3):
+            batcher.publish({"n": n}, "a")
+        # The message that doesn't fit is dropped rather than reordered
+        self.assertEqual(batcher.as_dict()["pending"], 2)
+        self.assertEqual(batcher.as_dict()["errors"], 1)
+        fallback.assert_not_called()
+
+        # Publishing waits for space
+        batcher, _, channel = self._get_batcher(max_batch_size=2,
+                                                max_pending=2)
+        batcher.start()
+        for n in range(10):
+            batcher.publish({"n": n}, "a")
+        batcher.stop()
+        self.assertEqual(self._published(channel),
+                         [("a", n) for n in range(10)])
+        self.assertEqual(batcher.as_dict()["errors"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Framework
+# All trademark and other rights reserved by their respective owners
+# Copyright 2008-2025 Neongecko.com Inc.
+# Contributors: Daniel McKnight, Guy Daniels, Elon Gasper, Richard Leeds,
+# Regina Bloomstine, Casimiro Ferreira, Andrii Pernatii, Kirill Hrymailo
+# BSD-3 License
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from this
+#    software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS  BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS;  OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import unittest
+
+from time import sleep
+
+from neon_messagebus_mq_connector.request_cache import RequestCache
+
+
+class RequestCacheTests(unittest.TestCase):
+    def test_check(self):
+        cache = RequestCache()
+        self.assertEqual(cache.check(("a", "1")), (False, []))
+        self.assertEqual(cache.check(("a", "1")), (True, []))
+        cache.add_response(("a", "1"), {"r": 1}, 8)
+        self.assertEqual(cache.check(("a", "1")), (True, [{"r": 1}]))
+        cache.add_response(("a", "2"), {"r": 2}, 8)
+        stats = cache.as_dict()
+        self.assertEqual(stats["entries"], 1)
+        self.assertEqual(stats["hits"], 2)
+        self.assertEqual(stats["misses"], 1)
+        self.assertAlmostEqual(stats["hit_rate"], 2 / 3, 4)
+        self.assertGreater(stats["bytes"], 0)
+
+    def test_limits(self):
+        cache = RequestCache(ttl=0.1, max_entries=2, max_bytes=20)
+        for key in ("1", "2", "3"):
+            cache.check(key)
+        self.assertEqual(list(cache._entries), ["2", "3"])
+        self.assertEqual(cache.evictions, 1)
+
+        # Responses exceeding `max_bytes` are not cached
+        cache.add_response("2", {"data": "x"}, 13)
+        self.assertEqual(len(cache._entries["2"].responses), 1)
+        cache.add_response("2", {"data": "x"}, 13)
+        self.assertEqual(cache.check("2"), (True, []))
+        self.assertEqual(cache.as_dict()["bytes"], 0)
+
+        # Bytes limit evicts the oldest requests
+        cache.add_response("3", {"data": "x"}, 13)
+        cache.check("4")
+        cache.add_response("4", {"data": "x"}, 13)
+        self.assertEqual(list(cache._entries), ["4"])
+        self.assertLessEqual(cache.as_dict()["bytes"], 20)
+
+        sleep(0.2)
+        self.assertEqual(cache.check("4"), (False, []))
+
+
+if __name__ == '__main__':
+    unittest.main()
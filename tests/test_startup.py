@@ -0,0 +1,80 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Framework
+# All trademark and other rights reserved by their respective owners
+# Copyright 2008-2025 Neongecko.com Inc.
+# Contributors: Daniel McKnight, Guy Daniels, Elon Gasper, Richard Leeds,
+# Regina Bloomstine, Casimiro Ferreira, Andrii Pernatii, Kirill Hrymailo
+# BSD-3 License
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from this
+#    software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS  BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS;  OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import subprocess
+import sys
+import unittest
+
+from threading import Event
+from unittest.mock import patch, Mock
+
+
+class StartupTests(unittest.TestCase):
+    def test_lazy_imports(self):
+        deferred = ("ovos_bus_client", "neon_data_models", "neon_utils")
+        for module in ("neon_messagebus_mq_connector",
+                       "neon_messagebus_mq_connector.__main__",
+                       "neon_messagebus_mq_connector.messages",
+                       "neon_messagebus_mq_connector.controller"):
+            result = subprocess.run(
+                [sys.executable, "-c",
+                 f"import sys, {module}; print([m for m in {deferred} "
+                 f"if m in sys.modules])"],
+                capture_output=True, text=True, check=True)
+            self.assertEqual(result.stdout.strip(), "[]", module)
+
+    def test_background_bus_connection(self):
+        from neon_messagebus_mq_connector.controller import ChatAPIProxy
+        config = {"MQ": {"server": "localhost",
+                         "users": {"chat_api_proxy": {"user": "test",
+                                                      "password": "test"}}},
+                  "websocket": {"host": "localhost"}}
+        connect_started = Event()
+        allow_connect = Event()
+
+        def _connect_bus(proxy, refresh=False):
+            connect_started.set()
+            allow_connect.wait(30)
+            proxy._bus = Mock()
+
+        with patch.object(ChatAPIProxy, "connect_bus", _connect_bus), \
+                patch.object(ChatAPIProxy, "async_consumers_enabled", False):
+            proxy = ChatAPIProxy(config, "chat_api_proxy")
+            # Init returns while the messagebus connection is blocked
+            self.assertTrue(connect_started.wait(30))
+            self.assertTrue(proxy._bus_thread.is_alive())
+            self.assertIsNone(proxy._bus)
+
+            # Accessing the bus waits for the connection
+            allow_connect.set()
+            self.assertIsInstance(proxy.bus, Mock)
+            self.assertFalse(proxy._bus_thread.is_alive())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Framework
+# All trademark and other rights reserved by their respective owners
+# Copyright 2008-2025 Neongecko.com Inc.
+# Contributors: Daniel McKnight, Guy Daniels, Elon Gasper, Richard Leeds,
+# Regina Bloomstine, Casimiro Ferreira, Andrii Pernatii, Kirill Hrymailo
+# BSD-3 License
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from this
+#    software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS  BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS;  OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import json
+import unittest
+
+from urllib.error import HTTPError
+from urllib.request import urlopen
+
+from neon_messagebus_mq_connector.status import StatusServer
+
+
+class StatusServerTests(unittest.TestCase):
+    def test_status_server(self):
+        status = {"ready": False, "saturation": 0.5}
+        server = StatusServer(lambda: status, port=0)
+        server.start()
+        url = f"http://127.0.0.1:{server.address[1]}"
+        try:
+            with self.assertRaises(HTTPError) as ctx:
+                urlopen(f"{url}/status")
+            self.assertEqual(ctx.exception.code, 503)
+            self.assertEqual(json.loads(ctx.exception.read()), status)
+
+            status["ready"] = True
+            with urlopen(f"{url}/status") as resp:
+                self.assertEqual(json.loads(resp.read()), status)
+            with urlopen(f"{url}/ready") as resp:
+                self.assertEqual(json.loads(resp.read()), {"ready": True})
+
+            with self.assertRaises(HTTPError) as ctx:
+                urlopen(f"{url}/invalid")
+            self.assertEqual(ctx.exception.code, 404)
+        finally:
+            server.stop()
+
+
+if __name__ == '__main__':
+    unittest.main()